@@ -0,0 +1 @@
+"""Benchmarks for the library books integration."""
@@ -0,0 +1,72 @@
+"""Measure calendar queries and sensor attribute builds at scale."""
+import json
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import peak_memory, time_call
+from benchmarks.payload_generator import generate_payload_bytes
+from custom_components.library_books.book_index import BookIndex
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper
+from custom_components.library_books.snapshot import BooksSnapshot
+
+TODAY = date(2025, 7, 1)
+
+
+class _Coordinator:
+    """Just enough of LibraryBooksCoordinator for the entities under test."""
+
+    def __init__(self, books):
+        self.data = books
+        self.index = BookIndex(books)
+        self.last_update_success = True
+
+
+def _books(count: int):
+    logging.getLogger("custom_components.library_books").setLevel(logging.WARNING)
+    scraper = LiberoLibraryScraper("https://library.example.com", "user", "pass")
+    return scraper._parse_libero_api_data(json.loads(generate_payload_bytes(count)))
+
+
+def _calendar_results(coordinator, repeat: int) -> dict:
+    try:
+        from custom_components.library_books.calendar import LibraryBooksCalendar
+    except ImportError:
+        return {"calendar_skipped": "homeassistant is not installed"}
+
+    calendar = LibraryBooksCalendar(coordinator, "benchmark", "Library")
+    start = datetime(TODAY.year, TODAY.month, 1)
+    return {
+        "calendar_month_s": time_call(lambda: calendar._get_events(start, start + timedelta(days=31)), repeat, 10)["best_s"],
+        "calendar_year_s": time_call(lambda: calendar._get_events(start, start + timedelta(days=365)), repeat, 10)["best_s"],
+        "calendar_next_event_s": time_call(lambda: calendar.event, repeat, 100)["best_s"],
+    }
+
+
+def run(count: int = 10_000, repeat: int = 5) -> dict:
+    """Return index, calendar and snapshot timings for the given number of books."""
+    books = _books(count)
+    coordinator = _Coordinator(books)
+    month_start = TODAY.replace(day=1)
+
+    results = {
+        "books": len(books),
+        "index_build_s": time_call(lambda: BookIndex(books), repeat)["best_s"],
+        "index_month_query_s": time_call(
+            lambda: coordinator.index.between(month_start, month_start + timedelta(days=31)), repeat, 100
+        )["best_s"],
+        "snapshot_build_s": time_call(lambda: BooksSnapshot(books, TODAY), repeat)["best_s"],
+        "snapshot_peak_bytes": peak_memory(lambda: BooksSnapshot(books, TODAY)),
+    }
+    results.update(_calendar_results(coordinator, repeat))
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key}: {value}")
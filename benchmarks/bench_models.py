@@ -0,0 +1,64 @@
+"""Measure LibraryBook memory use and construction throughput."""
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.models import LibraryBook
+
+AUTHORS = 200
+BASE_DATE = date(2025, 7, 1)
+
+
+def _book_fields(count: int):
+    """Build constructor arguments the way a parsed payload would provide them."""
+    # Strings are built individually so repeated authors are distinct objects,
+    # as they would be after json parsing
+    return [
+        {
+            "title": "".join(("Book title ", str(i), " /")),
+            "author": "".join(("Author, ", str(i % AUTHORS), " ")),
+            "due_date": BASE_DATE + timedelta(days=i % 60),
+            "isbn": str(9780000000000 + i),
+            "barcode": "".join(("B", str(i))),
+            "library_name": "".join(("Library Books - ", "Home")),
+        }
+        for i in range(count)
+    ]
+
+
+def run(count: int = 10_000) -> dict:
+    """Return memory per book (bytes) and construction throughput (books/second)."""
+    fields = _book_fields(count)
+
+    start = time.perf_counter()
+    books = [LibraryBook(**kwargs) for kwargs in fields]
+    elapsed = time.perf_counter() - start
+    del books
+
+    fields = _book_fields(count)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    books = [LibraryBook(**kwargs) for kwargs in fields]
+    # Drop the source arguments so only memory still held by the books is counted
+    del fields
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return {
+        "books": count,
+        "slots": not hasattr(books[0], "__dict__"),
+        "bytes_per_book": round(retained / count, 1),
+        "books_per_second": round(count / elapsed),
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for key, value in run(count).items():
+        print(f"{key}: {value}")
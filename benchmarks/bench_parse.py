@@ -0,0 +1,54 @@
+"""Measure Libero payload parsing throughput and memory."""
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.common import peak_memory, time_call
+from benchmarks.payload_generator import generate_payload_bytes
+from custom_components.library_books.scrapers import libero_scraper
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper
+
+
+def _stream_parse(scraper, payload: bytes):
+    parser = libero_scraper._StreamingPayloadParser()
+    for start in range(0, len(payload), libero_scraper.STREAM_CHUNK_SIZE):
+        parser.feed(payload[start:start + libero_scraper.STREAM_CHUNK_SIZE])
+    return scraper._parse_libero_api_data(parser.close())
+
+
+def run(loans: int = 10_000, history: int = 20_000, repeat: int = 5) -> dict:
+    """Return parse timings and peak memory for a payload of the given size."""
+    # Match Home Assistant's default log level, so per-book info logging is filtered
+    logging.getLogger("custom_components.library_books").setLevel(logging.WARNING)
+
+    scraper = LiberoLibraryScraper("https://library.example.com", "user", "pass")
+    payload = generate_payload_bytes(loans, history)
+    json_data = json.loads(payload)
+
+    parse = time_call(lambda: scraper._parse_libero_api_data(json_data), repeat)
+    loads_and_parse = time_call(lambda: scraper._parse_libero_api_data(json.loads(payload)), repeat)
+    results = {
+        "loans": loans,
+        "history": history,
+        "payload_bytes": len(payload),
+        "parse_s": parse["best_s"],
+        "parse_books_per_second": round(loans / parse["best_s"]),
+        "json_loads_and_parse_s": loads_and_parse["best_s"],
+        "json_peak_bytes": peak_memory(lambda: scraper._parse_libero_api_data(json.loads(payload))),
+    }
+
+    if libero_scraper.ijson is not None:
+        results["streaming_parse_s"] = time_call(lambda: _stream_parse(scraper, payload), repeat)["best_s"]
+        results["streaming_peak_bytes"] = peak_memory(lambda: _stream_parse(scraper, payload))
+
+    return results
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,26 @@
+"""Helpers shared by the benchmarks."""
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Time func, returning the best and median seconds per call."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"best_s": min(timings), "median_s": statistics.median(timings)}
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """Return the peak number of bytes allocated while func runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
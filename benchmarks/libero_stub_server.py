@@ -0,0 +1,232 @@
+"""
+Local stand-in for a Libero server, for end-to-end and load testing without network access.
+
+Mimics the two endpoints the scraper uses:
+- POST /libero/WebOpac.cls?ACTION=MEMLOGIN sets a session cookie
+- GET /libero/member/self/api.v1.cls returns the member JSON for a valid session,
+  or redirects to the OPAC login page when the session is missing or expired
+
+Responses can be slowed down, sessions can expire, and a fraction of requests can
+fail with 503 to exercise retries.
+
+Usage:
+    python benchmarks/libero_stub_server.py --port 8080 --loans 20 --latency 0.1
+"""
+import argparse
+import hashlib
+import random
+import sys
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.payload_generator import generate_payload_bytes
+
+LOGIN_PATH = "/libero/WebOpac.cls"
+API_PATH = "/libero/member/self/api.v1.cls"
+SESSION_COOKIE = "LIBERO_SESSION"
+LOGIN_PAGE = b"<html><body><form action='/libero/WebOpac.cls'>Login</form></body></html>"
+
+
+class LiberoStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stub's sessions and settings."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        loans: int = 10,
+        history: int = 0,
+        session_ttl: Optional[float] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            loans / history: Size of each member's payload
+            session_ttl: Seconds before a session expires (None for never)
+            latency: Seconds added to every response
+            error_rate: Fraction of requests answered with 503
+        """
+        super().__init__(address, LiberoStubHandler)
+        self.loans = loans
+        self.history = history
+        self.session_ttl = session_ttl
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats = {"logins": 0, "api_requests": 0, "not_modified": 0, "expired": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Tuple[str, float]] = {}
+        self._payloads: Dict[str, Tuple[bytes, str]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL to configure the scraper with."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LiberoStubServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def create_session(self, username: str) -> str:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[token] = (username, time.monotonic())
+            self.stats["logins"] += 1
+        return token
+
+    def session_user(self, token: Optional[str]) -> Optional[str]:
+        """Return the user for a valid session token."""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            username, created = session
+            if self.session_ttl is not None and time.monotonic() - created > self.session_ttl:
+                del self._sessions[token]
+                self.stats["expired"] += 1
+                return None
+            return username
+
+    def expire_sessions(self) -> None:
+        """Invalidate every session, as a server restart would."""
+        with self._lock:
+            self._sessions.clear()
+
+    def payload(self, username: str) -> Tuple[bytes, str]:
+        """Return the (body, etag) for a user, generated once per user."""
+        with self._lock:
+            if username not in self._payloads:
+                seed = int(hashlib.sha256(username.encode()).hexdigest()[:8], 16)
+                body = generate_payload_bytes(self.loans, self.history, seed=seed)
+                self._payloads[username] = (body, '"' + hashlib.sha256(body).hexdigest()[:16] + '"')
+            return self._payloads[username]
+
+
+class LiberoStubHandler(BaseHTTPRequestHandler):
+    """Request handler for the stub endpoints."""
+
+    server: LiberoStubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        """Keep the server quiet."""
+
+    def do_POST(self) -> None:
+        if not self._begin():
+            return
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path != LOGIN_PATH or query.get("ACTION") != ["MEMLOGIN"]:
+            self._send(404, b"Not found")
+            return
+
+        token = self.server.create_session(query.get("usernum", [""])[0])
+        self._send(200, LOGIN_PAGE, "text/html", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+
+    def do_GET(self) -> None:
+        if not self._begin():
+            return
+        url = urlsplit(self.path)
+        if url.path == LOGIN_PATH:
+            self._send(200, LOGIN_PAGE, "text/html")
+            return
+        if url.path != API_PATH:
+            self._send(404, b"Not found")
+            return
+
+        self.server.count("api_requests")
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        token = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+        username = self.server.session_user(token)
+        if username is None:
+            self._send(302, b"", "text/html", {"Location": f"{LOGIN_PATH}?ACTION=LOGIN"})
+            return
+
+        body, etag = self.server.payload(username)
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count("not_modified")
+            self._send(304, b"", None, {"ETag": etag})
+            return
+        self._send(200, body, "application/json", {"ETag": etag})
+
+    def _begin(self) -> bool:
+        """Apply latency and injected errors; return False if the request was answered."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.should_fail():
+            self.server.count("errors")
+            self._send(503, b"Service unavailable", "text/plain", {"Retry-After": "1"})
+            return False
+        return True
+
+    def _send(self, status: int, body: bytes, content_type: Optional[str] = "text/plain", headers=None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--loans", type=int, default=10)
+    parser.add_argument("--history", type=int, default=0)
+    parser.add_argument("--session-ttl", type=float, default=None, help="seconds before sessions expire")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = LiberoStubServer(
+        ("127.0.0.1", args.port), args.loans, args.history, args.session_ttl, args.latency, args.error_rate
+    )
+    print(f"Libero stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
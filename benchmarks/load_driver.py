@@ -0,0 +1,165 @@
+"""
+Drive many LiberoLibraryScraper instances against the local Libero stub.
+
+Each round refreshes every account concurrently, the way a burst of coordinator
+refreshes would, and reports wall-clock time, throughput, failures and how many
+executor threads the refreshes tied up.
+
+Usage:
+    python benchmarks/load_driver.py --accounts 200 --rounds 3 --transport requests
+    python benchmarks/load_driver.py --accounts 200 --transport aiohttp --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.libero_stub_server import LiberoStubServer
+from custom_components.library_books.const import TRANSPORT_AIOHTTP, TRANSPORT_REQUESTS
+from custom_components.library_books.scheduler import RefreshScheduler
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper
+from custom_components.library_books.session_pool import SessionPool
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Default executor that records how many jobs and threads it used."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.threads = set()
+
+    def submit(self, fn, *args, **kwargs):
+        def tracked():
+            with self._lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                self.threads.add(threading.get_ident())
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+        with self._lock:
+            self.jobs += 1
+        return super().submit(tracked)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.jobs = 0
+            self.peak_in_flight = 0
+            self.threads = set()
+
+
+async def run_load(
+    server: LiberoStubServer,
+    accounts: int,
+    rounds: int,
+    transport: str,
+    use_scheduler: bool,
+    executor_workers: int,
+) -> dict:
+    """Refresh every account `rounds` times and collect statistics."""
+    loop = asyncio.get_running_loop()
+    executor = CountingExecutor(max_workers=executor_workers)
+    loop.set_default_executor(executor)
+
+    pool = SessionPool()
+    scrapers = [
+        LiberoLibraryScraper(server.url, f"member{i}", "pin", session=pool.acquire(server.url, transport))
+        for i in range(accounts)
+    ]
+    scheduler = RefreshScheduler(coalesce_window=0) if use_scheduler else None
+
+    async def refresh(index: int, scraper: LiberoLibraryScraper) -> bool:
+        async def fetch():
+            return await scraper.get_books_with_retry(max_retries=2, force_login=False)
+
+        try:
+            if scheduler is None:
+                await fetch()
+            else:
+                await scheduler.async_run(f"account{index}", scraper.library_url, fetch)
+            return True
+        except Exception:
+            return False
+
+    results = []
+    try:
+        for round_number in range(1, rounds + 1):
+            executor.reset()
+            server_before = dict(server.stats)
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(refresh(i, scraper) for i, scraper in enumerate(scrapers)))
+            elapsed = time.perf_counter() - start
+            results.append({
+                "round": round_number,
+                "wall_clock_s": round(elapsed, 3),
+                "refreshes_per_second": round(accounts / elapsed, 1),
+                "failures": outcomes.count(False),
+                "executor_jobs": executor.jobs,
+                "executor_peak_in_flight": executor.peak_in_flight,
+                "executor_threads_used": len(executor.threads),
+                "server": {key: server.stats[key] - server_before[key] for key in server.stats},
+            })
+    finally:
+        for scraper in scrapers:
+            await scraper.logout()
+            await pool.async_release(server.url, transport)
+        executor.shutdown(wait=False)
+
+    return {
+        "accounts": accounts,
+        "transport": transport,
+        "scheduler": use_scheduler,
+        "rounds": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--transport", choices=[TRANSPORT_REQUESTS, TRANSPORT_AIOHTTP], default=TRANSPORT_REQUESTS)
+    parser.add_argument("--scheduler", action="store_true", help="route refreshes through RefreshScheduler")
+    parser.add_argument("--executor-workers", type=int, default=32, help="size of the default executor")
+    parser.add_argument("--loans", type=int, default=20)
+    parser.add_argument("--history", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stub response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests failing with 503")
+    parser.add_argument("--session-ttl", type=float, default=None, help="seconds before stub sessions expire")
+    parser.add_argument("--log-level", default="CRITICAL", help="log level for the scraper (logs go to stderr)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    server = LiberoStubServer(
+        loans=args.loans,
+        history=args.history,
+        session_ttl=args.session_ttl,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    ).start()
+    try:
+        report = asyncio.run(run_load(
+            server, args.accounts, args.rounds, args.transport, args.scheduler, args.executor_workers
+        ))
+    finally:
+        server.stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Generate synthetic Libero member payloads for benchmarks and load tests."""
+import json
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+AUTHORS = [
+    "Austen, Jane", "Dickens, Charles", "Tolkien, J. R. R.", "Christie, Agatha",
+    "Pratchett, Terry", "Le Guin, Ursula K.", "Dahl, Roald", "Rowling, J. K.",
+    "Atwood, Margaret", "Ishiguro, Kazuo", "Morrison, Toni", "Murakami, Haruki",
+]
+WORDS = [
+    "river", "garden", "night", "secret", "winter", "house", "journey", "stone",
+    "silver", "forest", "letters", "island", "shadow", "summer", "kingdom", "glass",
+]
+DATE_FORMATS = {
+    "iso": lambda d: datetime(d.year, d.month, d.day).isoformat() + "Z",
+    "date": lambda d: d.isoformat(),
+    "dmy": lambda d: d.strftime("%d/%m/%Y"),
+}
+
+
+def _title(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(2, 4))
+    # Catalogue titles often carry a trailing statement-of-responsibility slash
+    return "The " + " ".join(words).title() + rng.choice(["", " /", " / "])
+
+
+def generate_member(
+    loans: int,
+    history: int = 0,
+    today: date = date(2025, 7, 1),
+    date_format: str = "iso",
+    rng: random.Random = None,
+    barcode_offset: int = 0,
+) -> Dict[str, Any]:
+    """Generate one member with the given number of current loans and history items."""
+    rng = rng or random.Random(0)
+    format_date = DATE_FORMATS[date_format]
+
+    member_loans: List[Dict[str, Any]] = []
+    barcodes: List[Dict[str, Any]] = []
+    rsns: List[Dict[str, Any]] = []
+    for i in range(loans):
+        barcode = f"B{barcode_offset + i:08d}"
+        rsn = str(100000 + barcode_offset + i)
+        member_loans.append({
+            "Barcode": barcode,
+            # Loans are issued in batches, so many share a due date
+            "DueDate": format_date(today + timedelta(days=rng.randint(-10, 42))),
+            "RenewalCount": rng.randint(0, 3),
+            "IssueDate": format_date(today - timedelta(days=rng.randint(1, 60))),
+        })
+        barcodes.append({"Barcode": barcode, "RSN": rsn, "Location": "Main"})
+        rsns.append({
+            "RSN": rsn,
+            "ISBN": str(9780000000000 + barcode_offset + i) if rng.random() > 0.1 else "",
+            "Title": _title(rng),
+            "AuthorKey": rng.choice(AUTHORS) + rng.choice(["", " /"]),
+            "MainAuthor": rng.choice(AUTHORS),
+        })
+
+    loan_history = [
+        {
+            "Barcode": f"H{barcode_offset + i:08d}",
+            "Title": _title(rng),
+            "IssueDate": format_date(today - timedelta(days=rng.randint(60, 3650))),
+            "ReturnDate": format_date(today - timedelta(days=rng.randint(1, 59))),
+        }
+        for i in range(history)
+    ]
+
+    return {
+        "loans": member_loans,
+        "loanHistory": loan_history,
+        "_related": {"barcodes": barcodes, "rsns": rsns},
+    }
+
+
+def generate_payload(loans: int, history: int = 0, members: int = 1, seed: int = 0, **kwargs) -> Dict[str, Any]:
+    """Generate an api.v1.cls response with the given number of loans per member."""
+    rng = random.Random(seed)
+    return {
+        "members": [
+            generate_member(loans, history, rng=rng, barcode_offset=index * loans, **kwargs)
+            for index in range(members)
+        ]
+    }
+
+
+def generate_payload_bytes(loans: int, history: int = 0, members: int = 1, seed: int = 0, **kwargs) -> bytes:
+    """Generate an api.v1.cls response body."""
+    return json.dumps(generate_payload(loans, history, members, seed, **kwargs)).encode()
@@ -0,0 +1,110 @@
+"""
+Run every benchmark and record the results as JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.1
+
+Results from different commits can be compared with --compare; timings and
+memory that grow by more than the threshold are reported as regressions.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks import bench_entities, bench_models, bench_parse
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_all(books: int, history: int, repeat: int) -> dict:
+    """Run all benchmarks."""
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "books": books,
+            "history": history,
+        },
+        "results": {
+            "models": bench_models.run(books),
+            "parse": bench_parse.run(books, history, repeat),
+            "entities": bench_entities.run(books, repeat),
+        },
+    }
+
+
+def _lower_is_better(metric: str) -> bool:
+    return metric.endswith("_s") or metric.endswith("_bytes") or metric == "bytes_per_book"
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Return (benchmark, metric, baseline, current, change, regressed) rows."""
+    rows = []
+    for bench, metrics in current["results"].items():
+        for metric, value in metrics.items():
+            old = baseline.get("results", {}).get(bench, {}).get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or isinstance(value, bool):
+                continue
+            if metric in ("books", "loans", "history", "payload_bytes") or not old:
+                continue
+            change = (value - old) / old
+            if _lower_is_better(metric):
+                regressed = change > threshold
+            elif metric.endswith("_per_second"):
+                regressed = change < -threshold
+            else:
+                continue
+            rows.append((bench, metric, old, value, change, regressed))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=10_000, help="books (loans) per benchmark")
+    parser.add_argument("--history", type=int, default=20_000, help="loan history items in the parse payload")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change treated as a regression")
+    args = parser.parse_args()
+
+    current = run_all(args.books, args.history, args.repeat)
+    print(json.dumps(current, indent=2))
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        rows = compare(baseline, current, args.threshold)
+        print(f"\nCompared with {baseline['meta'].get('commit')} (threshold {args.threshold:.0%}):")
+        for bench, metric, old, value, change, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {bench}.{metric}: {old:.6g} -> {value:.6g} ({change:+.1%}) {flag}")
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 """The Library Books integration."""
 from datetime import timedelta
+import logging
+
+_LOGGER = logging.getLogger(__name__)
 
 # Try importing Home Assistant components, but don't fail if they're not available
 # This keeps your tests working while still supporting Home Assistant integration
@@ -7,14 +10,32 @@ try:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.const import Platform
+    from homeassistant.helpers import config_validation as cv
     
     PLATFORMS = [Platform.CALENDAR, Platform.SENSOR]
     
+    # Configured through the UI only
+    CONFIG_SCHEMA = cv.config_entry_only_config_schema("library_books")
+    
+    async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+        """Set up the Library Books services."""
+        from .services import async_setup_services
+        
+        async_setup_services(hass)
+        return True
+    
     async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         """Set up Library Books from a config entry."""
         from .coordinator import LibraryBooksCoordinator
-        from .scrapers.libero_scraper import LiberoLibraryScraper
-        from .const import DOMAIN, CONF_LIBRARY_TYPE, CONF_LIBRARY_URL, CONF_USERNAME, CONF_PASSWORD, CONF_NAME
+        from .const import (
+            DOMAIN, DATA_AGGREGATE, CONF_ALL_LIBRARIES, CONF_LIBRARY_TYPE, CONF_LIBRARY_URL, CONF_USERNAME, CONF_PASSWORD, CONF_NAME,
+            CONF_TRANSPORT, LEGACY_TRANSPORT,
+            CONF_UPDATE_INTERVAL, CONF_ADAPTIVE_UPDATE_INTERVAL, CONF_MIN_UPDATE_INTERVAL, CONF_MAX_UPDATE_INTERVAL,
+            DEFAULT_UPDATE_INTERVAL, DEFAULT_ADAPTIVE_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL,
+        )
+        
+        if entry.data.get(CONF_ALL_LIBRARIES):
+            return await async_setup_all_libraries(hass, entry)
         
         # Get configuration
         library_type = entry.data[CONF_LIBRARY_TYPE]
@@ -22,41 +43,204 @@ try:
         username = entry.data[CONF_USERNAME]
         password = entry.data[CONF_PASSWORD]
         name = entry.data[CONF_NAME]
+        # The transport can be changed in the options after setup
+        transport = entry.options.get(CONF_TRANSPORT, entry.data.get(CONF_TRANSPORT, LEGACY_TRANSPORT))
+        
+        # Polling options (in minutes)
+        update_interval = timedelta(minutes=entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL))
+        adaptive_interval = None
+        if entry.options.get(CONF_ADAPTIVE_UPDATE_INTERVAL, DEFAULT_ADAPTIVE_UPDATE_INTERVAL):
+            adaptive_interval = (
+                timedelta(minutes=entry.options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL)),
+                timedelta(minutes=entry.options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL)),
+            )
         
         # Create appropriate scraper
-        if library_type == "libero":
-            scraper = LiberoLibraryScraper(library_url, username, password)
-        else:
+        scraper_class = await async_get_scraper_class(hass, library_type)
+        if scraper_class is None:
             return False
+        session = async_get_session_pool(hass).acquire(library_url, transport)
+        scraper = scraper_class(library_url, username, password, session=session)
         
         # Create coordinator and store in hass data
         coordinator = LibraryBooksCoordinator(
             hass,
             scraper,
             name=f"Library Books - {name}",
-            update_interval=timedelta(hours=6),
+            update_interval=update_interval,
+            entry_id=entry.entry_id,
+            scheduler=async_get_refresh_scheduler(hass),
+            adaptive_interval=adaptive_interval,
+            cover_cache=await async_get_cover_cache(hass),
         )
         
-        # Update the coordinator's data for the first time
-        await coordinator.async_config_entry_first_refresh()
+        # Reuse the session and books from the last run
+        if await coordinator.async_restore():
+            # Entities come up from the cache; the first network refresh runs in the background
+            entry.async_create_background_task(
+                hass, coordinator.async_startup_refresh(), f"{DOMAIN} first refresh {name}"
+            )
+        else:
+            # Nothing cached yet, so the first refresh has to finish before setup
+            try:
+                await coordinator.async_config_entry_first_refresh()
+            except Exception:
+                await async_release_scraper(hass, scraper, library_url, transport)
+                raise
+        
+        # Released with the transport it was acquired with, even if the options changed since
+        entry.async_on_unload(lambda: async_release_scraper(hass, scraper, library_url, transport))
         
         # Store the coordinator directly in hass.data
         hass.data.setdefault(DOMAIN, {})
         hass.data[DOMAIN][entry.entry_id] = coordinator
         
+        from .services import async_update_renew_service
+        
+        async_update_renew_service(hass)
+        
+        # Feed the all-libraries entities, if they are set up
+        aggregate = hass.data[DOMAIN].get(DATA_AGGREGATE)
+        if aggregate is not None:
+            aggregate.async_add_coordinator(entry.entry_id, name, coordinator)
+        
         await hass.config_entries.async_forward_entry_setups(
             entry, ["sensor", "calendar"]
         )
+        
+        # Overdue counts change at midnight even when the books don't
+        from homeassistant.helpers.event import async_track_time_change
+        entry.async_on_unload(
+            async_track_time_change(hass, coordinator.async_handle_midnight, hour=0, minute=0, second=0)
+        )
+        
+        # Reload when the options change so the new polling settings apply
+        entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+        return True
+    
+    async def async_setup_all_libraries(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+        """Set up the calendar and sensors across all library accounts."""
+        from .aggregate import LibraryBooksAggregate
+        from .coordinator import LibraryBooksCoordinator
+        from .const import DOMAIN, DATA_AGGREGATE, CONF_NAME
+        
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        aggregate = domain_data[DATA_AGGREGATE] = domain_data[entry.entry_id] = LibraryBooksAggregate(hass)
+        # Accounts set up later add themselves in async_setup_entry
+        for library_entry in hass.config_entries.async_entries(DOMAIN):
+            coordinator = domain_data.get(library_entry.entry_id)
+            if isinstance(coordinator, LibraryBooksCoordinator):
+                aggregate.async_add_coordinator(library_entry.entry_id, library_entry.data[CONF_NAME], coordinator)
+        
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         return True
     
+    async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload a config entry after its options changed."""
+        await hass.config_entries.async_reload(entry.entry_id)
+    
+    async def async_get_scraper_class(hass: HomeAssistant, library_type: str):
+        """Return the scraper class for a library type, or None if it isn't supported."""
+        from .scrapers import SCRAPERS, get_scraper_class
+        
+        if library_type not in SCRAPERS:
+            _LOGGER.error(f"Unsupported library type: {library_type}")
+            return None
+        # Importing a backend module is blocking I/O, so keep it off the event loop
+        add_import_job = getattr(hass, "async_add_import_executor_job", hass.async_add_executor_job)
+        return await add_import_job(get_scraper_class, library_type)
+    
+    def async_get_session_pool(hass: HomeAssistant):
+        """Return the connection pool shared by all library accounts."""
+        from functools import partial
+        from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+        from homeassistant.helpers.aiohttp_client import async_create_clientsession
+        from .const import DOMAIN, DATA_SESSION_POOL
+        from .session_pool import SessionPool
+        
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if DATA_SESSION_POOL not in domain_data:
+            # aiohttp sessions use Home Assistant's SSL context, user agent and connector.
+            # The scrapers close them on unload, so Home Assistant needn't track them
+            pool = domain_data[DATA_SESSION_POOL] = SessionPool(
+                partial(async_create_clientsession, hass, auto_cleanup=False)
+            )
+            
+            async def _async_close_pool(event) -> None:
+                await pool.async_close()
+            
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_pool)
+        return domain_data[DATA_SESSION_POOL]
+    
+    def async_get_refresh_scheduler(hass: HomeAssistant):
+        """Return the scheduler shared by all library accounts."""
+        from .const import DOMAIN, DATA_SCHEDULER
+        from .scheduler import RefreshScheduler
+        
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if DATA_SCHEDULER not in domain_data:
+            domain_data[DATA_SCHEDULER] = RefreshScheduler()
+        return domain_data[DATA_SCHEDULER]
+    
+    async def async_get_cover_cache(hass: HomeAssistant):
+        """Return the cover cache shared by all library accounts, serving it over HTTP."""
+        import aiohttp
+        from homeassistant.helpers.aiohttp_client import async_get_clientsession
+        from .const import DOMAIN, DATA_COVER_CACHE, COVER_CACHE_DIR
+        from .cover_cache import COVER_REQUEST_TIMEOUT, CoverCache
+        from .views import LibraryCoverView
+        
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if DATA_COVER_CACHE not in domain_data:
+            session = async_get_clientsession(hass)
+            
+            async def _async_fetch_cover(url: str):
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=COVER_REQUEST_TIMEOUT)) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.read(), response.content_type
+            
+            cache = domain_data[DATA_COVER_CACHE] = CoverCache(hass.config.path(COVER_CACHE_DIR), _async_fetch_cover)
+            await cache.async_load()
+            if hass.http is not None:
+                hass.http.register_view(LibraryCoverView(cache))
+        return domain_data[DATA_COVER_CACHE]
+    
+    async def async_release_scraper(hass: HomeAssistant, scraper, library_url: str, transport: str) -> None:
+        """Log out a scraper and return its connections to the shared pool."""
+        await scraper.logout()
+        await async_get_session_pool(hass).async_release(library_url, transport)
+    
     async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         """Unload a config entry."""
+        from .const import DATA_AGGREGATE, DATA_COVER_CACHE, CONF_ALL_LIBRARIES
+        
         unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-        if unload_ok:
-            coordinator = hass.data[DOMAIN][entry.entry_id]
-            await coordinator.scraper.logout()
+        if unload_ok and entry.data.get(CONF_ALL_LIBRARIES):
+            hass.data[DOMAIN].pop(DATA_AGGREGATE).async_remove_all()
+            hass.data[DOMAIN].pop(entry.entry_id)
+        elif unload_ok:
+            aggregate = hass.data[DOMAIN].get(DATA_AGGREGATE)
+            if aggregate is not None:
+                aggregate.async_remove_coordinator(entry.entry_id)
+            # The scraper is released by the unload callback registered in async_setup_entry
+            async_get_refresh_scheduler(hass).forget(entry.entry_id)
+            cover_cache = hass.data[DOMAIN].get(DATA_COVER_CACHE)
+            if cover_cache is not None:
+                cover_cache.forget(entry.entry_id)
             hass.data[DOMAIN].pop(entry.entry_id)
+            
+            from .services import async_update_renew_service
+            
+            async_update_renew_service(hass)
         return unload_ok
+    
+    async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Remove persisted data when a config entry is deleted."""
+        from homeassistant.helpers.storage import Store
+        from .const import STORAGE_KEY, STORAGE_VERSION
+        
+        await Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry.entry_id)).async_remove()
         
 except ImportError:
     # When running tests without Home Assistant installed, these functions won't be available
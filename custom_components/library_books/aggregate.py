@@ -0,0 +1,86 @@
+"""Merged view over every loaded library account, for the all-libraries entities."""
+from functools import partial
+import logging
+from typing import Callable, Dict, List
+
+from homeassistant.core import HomeAssistant, callback
+
+from .book_index import MergedBookIndex
+from .coordinator import LibraryBooksCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+class LibraryBooksAggregate:
+    """
+    Follows the coordinator of every library account and keeps a merged due-date view.
+
+    When one coordinator updates, only its index is swapped into the view; the
+    other accounts' books aren't touched.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the aggregate."""
+        self.hass = hass
+        self.index = MergedBookIndex()
+        self.coordinators: Dict[str, LibraryBooksCoordinator] = {}
+        self.library_names: Dict[str, str] = {}
+        self._unsubscribers: Dict[str, Callable[[], None]] = {}
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def stale(self) -> bool:
+        """Return True if any account still shows cached books from a previous run."""
+        return any(coordinator.stale for coordinator in self.coordinators.values())
+
+    @callback
+    def async_add_coordinator(self, entry_id: str, library_name: str, coordinator: LibraryBooksCoordinator) -> None:
+        """Start following a library account."""
+        self.async_remove_coordinator(entry_id)
+        self.coordinators[entry_id] = coordinator
+        self.library_names[entry_id] = library_name
+        self._unsubscribers[entry_id] = coordinator.async_add_listener(
+            partial(self._async_coordinator_updated, entry_id)
+        )
+        self._async_coordinator_updated(entry_id)
+
+    @callback
+    def async_remove_coordinator(self, entry_id: str) -> None:
+        """Stop following a library account and drop its books from the view."""
+        unsubscribe = self._unsubscribers.pop(entry_id, None)
+        if unsubscribe is None:
+            return
+        unsubscribe()
+        self.coordinators.pop(entry_id)
+        self.library_names.pop(entry_id)
+        self.index.remove(entry_id)
+        self._async_update_listeners()
+
+    @callback
+    def async_remove_all(self) -> None:
+        """Stop following every library account."""
+        for entry_id in list(self._unsubscribers):
+            self.async_remove_coordinator(entry_id)
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Call update_callback whenever any account updates; returns a function to remove it."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_coordinator_updated(self, entry_id: str) -> None:
+        """Swap in the updated account's index and notify the all-libraries entities."""
+        if self.index.update(entry_id, self.coordinators[entry_id].index):
+            _LOGGER.debug(f"Merged due-date view updated for {self.library_names[entry_id]}")
+        # Midnight and the stale flag change the entities even when the books don't
+        self._async_update_listeners()
+
+    @callback
+    def _async_update_listeners(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,140 @@
+"""Due-date-ordered index over library books."""
+from bisect import bisect_left
+from datetime import date
+from heapq import merge
+from operator import attrgetter
+from typing import Callable, Dict, Generic, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .models import LibraryBook
+
+T = TypeVar("T")
+
+class BookIndex:
+    """
+    Books sorted by due date, built once per update.
+
+    Range and next-due queries use bisection, so they cost O(log n + k) and never
+    re-sort. Books without a due date are left out.
+    """
+
+    def __init__(self, books: Iterable[LibraryBook] = ()):
+        """Build the index."""
+        self._books: List[LibraryBook] = sorted(
+            (book for book in books if book.due_date), key=attrgetter("due_date")
+        )
+        self._due_dates: List[date] = [book.due_date for book in self._books]
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __iter__(self) -> Iterator[LibraryBook]:
+        return iter(self._books)
+
+    def between(self, start: date, end: date) -> List[LibraryBook]:
+        """Return books due on or after start and before end, in due date order."""
+        return self._books[bisect_left(self._due_dates, start):bisect_left(self._due_dates, end)]
+
+    def next_due(self, start: date, end: Optional[date] = None) -> Optional[LibraryBook]:
+        """Return the first book due on or after start (and before end, if given)."""
+        position = bisect_left(self._due_dates, start)
+        if position == len(self._books):
+            return None
+        book = self._books[position]
+        if end is not None and book.due_date >= end:
+            return None
+        return book
+
+def _due_date(entry: Tuple[Hashable, LibraryBook]) -> date:
+    return entry[1].due_date
+
+class MergedBookIndex:
+    """
+    Due-date-ordered view over the indexes of several sources (library accounts).
+
+    Each source keeps its own BookIndex; updating one source only swaps its index,
+    and queries merge the per-source results lazily, so a refresh never rebuilds
+    the other sources' lists. Results are (source, book) pairs, with ties in the
+    order the sources were added.
+    """
+
+    def __init__(self):
+        """Initialize an empty view."""
+        self._indexes: Dict[Hashable, BookIndex] = {}
+
+    def update(self, source: Hashable, index: BookIndex) -> bool:
+        """Set the index of a source; returns False if it was already current."""
+        if self._indexes.get(source) is index:
+            return False
+        self._indexes[source] = index
+        return True
+
+    def remove(self, source: Hashable) -> None:
+        """Drop a source from the view."""
+        self._indexes.pop(source, None)
+
+    @property
+    def sources(self) -> List[Hashable]:
+        """Return the sources in the view."""
+        return list(self._indexes)
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self._indexes.values())
+
+    def __iter__(self) -> Iterator[Tuple[Hashable, LibraryBook]]:
+        return merge(*(self._tagged(source, index) for source, index in self._indexes.items()), key=_due_date)
+
+    def source_index(self, source: Hashable) -> BookIndex:
+        """Return the index of one source."""
+        return self._indexes[source]
+
+    def between(self, start: date, end: date) -> List[Tuple[Hashable, LibraryBook]]:
+        """Return books of every source due on or after start and before end, in due date order."""
+        return list(merge(
+            *(self._tagged(source, index.between(start, end)) for source, index in self._indexes.items()),
+            key=_due_date,
+        ))
+
+    def next_due(self, start: date, end: Optional[date] = None) -> Optional[Tuple[Hashable, LibraryBook]]:
+        """Return the first book of any source due on or after start (and before end, if given)."""
+        first = None
+        for source, index in self._indexes.items():
+            book = index.next_due(start, end)
+            if book is not None and (first is None or book.due_date < first[1].due_date):
+                first = (source, book)
+        return first
+
+    @staticmethod
+    def _tagged(source: Hashable, books: Iterable[LibraryBook]) -> Iterator[Tuple[Hashable, LibraryBook]]:
+        return ((source, book) for book in books)
+
+class BookMemo(Generic[T]):
+    """
+    Values derived from the books of one index, such as calendar events.
+
+    Each value is built the first time its book is asked for and reused until the
+    index is replaced or the date changes, since values may depend on whether the
+    book is overdue. Books are keyed by identity, which is stable while the index
+    holds them.
+    """
+
+    def __init__(self, build: Callable[[LibraryBook, date], T]):
+        """Initialize the memo; build(book, today) creates a value."""
+        self._build = build
+        self._index: Optional[BookIndex] = None
+        self._today: Optional[date] = None
+        self._values: Dict[int, T] = {}
+
+    def get(self, index: BookIndex, book: LibraryBook, today: date) -> T:
+        """Return the value for a book of index, building it if needed."""
+        if index is not self._index or today != self._today:
+            self._index = index
+            self._today = today
+            self._values = {}
+        value = self._values.get(id(book))
+        if value is None:
+            value = self._values[id(book)] = self._build(book, today)
+        return value
+
+    def get_many(self, index: BookIndex, books: Iterable[LibraryBook], today: date) -> List[T]:
+        """Return the values for several books of index, in order."""
+        return [self.get(index, book, today) for book in books]
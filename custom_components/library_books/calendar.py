@@ -1,17 +1,19 @@
 """Calendar platform for Library Books integration."""
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import partial
 import logging
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Dict, Optional
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util import dt as dt_util
 
+from .aggregate import LibraryBooksAggregate
+from .book_index import BookMemo
 from .models import LibraryBook
-from .const import DOMAIN, CONF_NAME
-from .coordinator import LibraryBooksCoordinator
+from .const import DOMAIN, CONF_NAME, CONF_ALL_LIBRARIES, ALL_LIBRARIES_NAME
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,12 +23,28 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Library Books calendar."""
+    if entry.data.get(CONF_ALL_LIBRARIES):
+        async_add_entities([AllLibrariesCalendar(hass.data[DOMAIN][entry.entry_id], entry.entry_id)])
+        return
+    
     coordinator = hass.data[DOMAIN][entry.entry_id]
     library_name = entry.data.get(CONF_NAME, "Library")
     
     async_add_entities([LibraryBooksCalendar(coordinator, entry.entry_id, library_name)], True)
 
 
+def _book_event(book: LibraryBook, today: date, location: str, uid: Optional[str]) -> CalendarEvent:
+    """Create the calendar event for a book."""
+    return CalendarEvent(
+        start=book.due_date,
+        end=book.due_date + timedelta(days=1),
+        summary=book.title or "Unknown Title",
+        description=f"Author: {book.author or 'N/A'}\nOverdue: {'Yes' if book.due_date < today else 'No'}",
+        location=location,
+        uid=uid,
+    )
+
+
 class LibraryBooksCalendar(CalendarEntity):
     """A calendar for library books."""
 
@@ -39,13 +57,16 @@ class LibraryBooksCalendar(CalendarEntity):
         self._library_name = library_name
         self._attr_name = library_name
         self._attr_unique_id = f"{entry_id}_calendar"
+        # Events are built once per update and day, then shared by every query
+        self._events: BookMemo[CalendarEvent] = BookMemo(self._book_event)
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
-        now = dt_util.now()
-        events = self._get_events(now, now + timedelta(days=365))
-        return events[0] if events else None
+        today = dt_util.now().date()
+        index = self.coordinator.index
+        book = index.next_due(today, today + timedelta(days=365))
+        return self._events.get(index, book, today) if book else None
 
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
@@ -55,28 +76,14 @@ class LibraryBooksCalendar(CalendarEntity):
 
     def _get_events(self, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
         """Get all events in a specific time frame."""
-        events = []
-        books: list[LibraryBook] = self.coordinator.data or []
-
-        for book in books:
-            if not book.due_date:
-                continue
-
-            due_date = book.due_date
-
-            if start_date.date() <= due_date < end_date.date():
-                event = CalendarEvent(
-                    start=due_date,
-                    end=due_date + timedelta(days=1),
-                    summary=book.title or "Unknown Title",
-                    description=f"Author: {book.author or 'N/A'}\nOverdue: {'Yes' if book.is_overdue else 'No'}",
-                    location=self._library_name,
-                    uid=book.barcode,
-                )
-                events.append(event)
-        
-        events.sort(key=lambda e: e.start)
-        return events
+        # The index is already in due date order, so no sorting is needed
+        index = self.coordinator.index
+        books = index.between(start_date.date(), end_date.date())
+        return self._events.get_many(index, books, dt_util.now().date())
+
+    def _book_event(self, book: LibraryBook, today: date) -> CalendarEvent:
+        """Create the calendar event for a book."""
+        return _book_event(book, today, self._library_name, book.barcode)
 
     @property
     def name(self) -> str:
@@ -96,4 +103,66 @@ class LibraryBooksCalendar(CalendarEntity):
         # Calendar is available even if the last update failed, as long as we have previous data
         return self.coordinator.last_update_success or (
             hasattr(self.coordinator, 'data') and self.coordinator.data is not None
-        )
\ No newline at end of file
+        )
+
+
+class AllLibrariesCalendar(CalendarEntity):
+    """A calendar of the books of every library account, read from the merged due-date view."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, aggregate: LibraryBooksAggregate, entry_id: str):
+        """Initialize the calendar."""
+        self.aggregate = aggregate
+        self._attr_name = ALL_LIBRARIES_NAME
+        self._attr_unique_id = f"{entry_id}_calendar"
+        # Events per library account, built once per update of that account and per day
+        self._events: Dict[str, BookMemo[CalendarEvent]] = {}
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever any library account updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.aggregate.async_add_listener(self._async_handle_update))
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Forget the events of removed accounts and write the state."""
+        for entry_id in set(self._events) - set(self.aggregate.library_names):
+            del self._events[entry_id]
+        self.async_write_ha_state()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the next upcoming event across all libraries."""
+        today = dt_util.now().date()
+        entry = self.aggregate.index.next_due(today, today + timedelta(days=365))
+        return self._event(*entry, today) if entry else None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return calendar events of every library within a datetime range."""
+        today = dt_util.now().date()
+        return [
+            self._event(entry_id, book, today)
+            for entry_id, book in self.aggregate.index.between(start_date.date(), end_date.date())
+        ]
+
+    def _event(self, entry_id: str, book: LibraryBook, today: date) -> CalendarEvent:
+        """Return the memoised calendar event for a book of one library account."""
+        memo = self._events.get(entry_id)
+        if memo is None:
+            memo = self._events[entry_id] = BookMemo(partial(self._book_event, entry_id))
+        return memo.get(self.aggregate.index.source_index(entry_id), book, today)
+
+    def _book_event(self, entry_id: str, book: LibraryBook, today: date) -> CalendarEvent:
+        """Create the calendar event for a book, located at its library."""
+        # Barcodes are only unique within one library
+        uid = f"{entry_id}_{book.barcode}" if book.barcode else None
+        return _book_event(book, today, self.aggregate.library_names[entry_id], uid)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the libraries the calendar covers."""
+        return {"libraries": list(self.aggregate.library_names.values())}
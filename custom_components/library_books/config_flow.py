@@ -3,38 +3,60 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.util import slugify
 
-from .const import DOMAIN, CONF_LIBRARY_TYPE, CONF_LIBRARY_URL, CONF_USERNAME, CONF_PASSWORD, CONF_NAME
-from .scrapers.libero_scraper import LiberoLibraryScraper
+from .const import (
+    DOMAIN, CONF_ALL_LIBRARIES, ALL_LIBRARIES_NAME, CONF_LIBRARY_TYPE, CONF_LIBRARY_URL, CONF_USERNAME, CONF_PASSWORD, CONF_NAME,
+    CONF_TRANSPORT, TRANSPORTS, DEFAULT_TRANSPORT, LEGACY_TRANSPORT,
+    CONF_UPDATE_INTERVAL, CONF_ADAPTIVE_UPDATE_INTERVAL, CONF_MIN_UPDATE_INTERVAL, CONF_MAX_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL, DEFAULT_ADAPTIVE_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL,
+)
+from .library_scraper import normalize_library_url
+from .scrapers import LIBRARY_TYPES
 
 _LOGGER = logging.getLogger(__name__)
 
-LIBRARY_TYPES = ["libero"]
-
-def _normalize_library_url(url: str) -> str:
-    """Ensure the library URL has https:// and no trailing slash."""
-    url = url.strip()
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "https://" + url
-    url = url.rstrip("/")
-    return url
-
 class LibraryBooksConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Library Books."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return LibraryBooksOptionsFlow(config_entry)
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, config_entry: config_entries.ConfigEntry) -> bool:
+        """Only library accounts have polling options."""
+        return not config_entry.data.get(CONF_ALL_LIBRARIES)
+
     async def async_step_user(self, user_input=None) -> FlowResult:
         """Handle the initial step."""
+        # The all-libraries entities are optional and added once, after the first account
+        entries = self._async_current_entries()
+        if entries and not any(entry.data.get(CONF_ALL_LIBRARIES) for entry in entries):
+            return self.async_show_menu(step_id="user", menu_options=["library", "all_libraries"])
+        return await self.async_step_library()
+
+    async def async_step_all_libraries(self, user_input=None) -> FlowResult:
+        """Add a calendar and sensors covering every library account."""
+        await self.async_set_unique_id(CONF_ALL_LIBRARIES)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=ALL_LIBRARIES_NAME, data={CONF_ALL_LIBRARIES: True})
+
+    async def async_step_library(self, user_input=None) -> FlowResult:
+        """Handle adding a library account."""
         errors = {}
         
         if user_input is not None:
             # Clean up the library URL
-            user_input[CONF_LIBRARY_URL] = _normalize_library_url(user_input[CONF_LIBRARY_URL])
+            user_input[CONF_LIBRARY_URL] = normalize_library_url(user_input[CONF_LIBRARY_URL])
             # Create unique ID using library name and username - properly slugified
             safe_library_name = slugify(user_input[CONF_NAME])
             safe_username = slugify(user_input[CONF_USERNAME])
@@ -50,20 +72,27 @@ class LibraryBooksConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 password = user_input[CONF_PASSWORD]
                 name = user_input[CONF_NAME]
                 
-                if library_type == "libero":
-                    scraper = LiberoLibraryScraper(library_url, username, password)
-                else:
+                from . import async_get_scraper_class, async_get_session_pool
+                scraper_class = await async_get_scraper_class(self.hass, library_type)
+                if scraper_class is None:
                     errors["base"] = "unsupported_library"
                     return self.async_show_form(
-                        step_id="user", data_schema=self._get_schema(), errors=errors
+                        step_id="library", data_schema=self._get_schema(), errors=errors
                     )
+                pool = async_get_session_pool(self.hass)
+                session = pool.acquire(library_url, user_input[CONF_TRANSPORT])
+                scraper = scraper_class(library_url, username, password, session=session)
 
                 # Try to login
-                login_successful = await scraper.login()
+                try:
+                    login_successful = await scraper.login()
+                finally:
+                    await scraper.logout()
+                    await pool.async_release(library_url, user_input[CONF_TRANSPORT])
                 if not login_successful:
                     errors["base"] = "invalid_auth"
                     return self.async_show_form(
-                        step_id="user", data_schema=self._get_schema(user_input), errors=errors
+                        step_id="library", data_schema=self._get_schema(user_input), errors=errors
                     )
 
                 # Create the config entry
@@ -77,7 +106,7 @@ class LibraryBooksConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "unknown"
 
         return self.async_show_form(
-            step_id="user", 
+            step_id="library", 
             data_schema=self._get_schema(user_input), 
             errors=errors
         )
@@ -97,4 +126,53 @@ class LibraryBooksConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Required(CONF_LIBRARY_URL, default=user_input.get(CONF_LIBRARY_URL, "")): str,
             vol.Required(CONF_USERNAME, default=user_input.get(CONF_USERNAME, "")): str,
             vol.Required(CONF_PASSWORD, default=user_input.get(CONF_PASSWORD, "")): str,
-        })
\ No newline at end of file
+            vol.Required(
+                CONF_TRANSPORT,
+                default=user_input.get(CONF_TRANSPORT, DEFAULT_TRANSPORT)
+            ): vol.In(TRANSPORTS),
+        })
+
+class LibraryBooksOptionsFlow(config_entries.OptionsFlow):
+    """Handle Library Books options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Manage the transport and polling options."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_TRANSPORT,
+                    default=options.get(CONF_TRANSPORT, self._entry.data.get(CONF_TRANSPORT, LEGACY_TRANSPORT)),
+                ): vol.In(TRANSPORTS),
+                vol.Required(
+                    CONF_ADAPTIVE_UPDATE_INTERVAL,
+                    default=options.get(CONF_ADAPTIVE_UPDATE_INTERVAL, DEFAULT_ADAPTIVE_UPDATE_INTERVAL),
+                ): bool,
+                vol.Required(
+                    CONF_UPDATE_INTERVAL,
+                    default=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+            }),
+            errors=errors,
+        )
@@ -1,6 +1,24 @@
 """Constants for the Library Books integration."""
 
 DOMAIN = "library_books"
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN + ".{entry_id}"
+
+# Keys for domain-wide objects in hass.data[DOMAIN], alongside the per-entry coordinators
+DATA_SESSION_POOL = "session_pool"
+DATA_SCHEDULER = "scheduler"
+DATA_COVER_CACHE = "cover_cache"
+DATA_AGGREGATE = "aggregate"
+
+# Fired when loans are added, returned or changed (e.g. renewed) between refreshes
+EVENT_LOANS_CHANGED = "library_books_loans_changed"
+
+# Local URL the cached cover of a book is served from
+COVER_URL = "/api/library_books/cover/{isbn}"
+# Days a signed cover URL stays valid; they are signed again when the snapshot is rebuilt at midnight
+COVER_URL_EXPIRATION_DAYS = 2
+# Directory in the config folder the covers are kept in
+COVER_CACHE_DIR = ".storage/library_books_covers"
 
 # Configuration constants
 CONF_LIBRARY_TYPE = "library_type"
@@ -9,19 +27,30 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_NAME = "name"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_ADAPTIVE_UPDATE_INTERVAL = "adaptive_update_interval"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_TRANSPORT = "transport"
+# Set on the optional entry that adds calendar and sensors across all library accounts
+CONF_ALL_LIBRARIES = "all_libraries"
 
-DEFAULT_UPDATE_INTERVAL = 60  # in minutes
+DEFAULT_UPDATE_INTERVAL = 360  # in minutes, used when the adaptive interval is disabled
+# Opt-in, so upgraded entries keep polling at their configured interval
+DEFAULT_ADAPTIVE_UPDATE_INTERVAL = False
+DEFAULT_MIN_UPDATE_INTERVAL = 60  # in minutes
+DEFAULT_MAX_UPDATE_INTERVAL = 1440  # in minutes
 DEFAULT_CALENDAR_NAME = "Library Books"
+ALL_LIBRARIES_NAME = "All Libraries"
+# Days ahead counted by the all-libraries "due this week" sensor
+DUE_SOON_DAYS = 7
 
-# Supported library types
-LIBRARY_TYPES = {
-    "libero": "Libero Library System",
-    # add others here, such as...
-    #"koha": "Koha Library System",
-    #"sirsi": "SirsiDynix", 
-    #"polaris": "Polaris ILS",
-    #"evergreen": "Evergreen ILS",
-}
+# HTTP transports used by the scrapers
+TRANSPORT_AIOHTTP = "aiohttp"
+TRANSPORT_REQUESTS = "requests"
+TRANSPORTS = [TRANSPORT_AIOHTTP, TRANSPORT_REQUESTS]
+DEFAULT_TRANSPORT = TRANSPORT_AIOHTTP
+# Entries created before the transport option existed keep using requests
+LEGACY_TRANSPORT = TRANSPORT_REQUESTS
 
 # Sensor names
 SENSOR_NAME = "Library Books Outstanding"
\ No newline at end of file
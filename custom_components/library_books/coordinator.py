@@ -1,15 +1,27 @@
 """Data coordinator for library books integration."""
 from datetime import timedelta
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import asyncio
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components.http.auth import async_sign_path
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
-from .library_scraper import BaseLibraryScraper
+from .book_index import BookIndex
+from .const import (
+    COVER_URL, COVER_URL_EXPIRATION_DAYS, DOMAIN, EVENT_LOANS_CHANGED, STORAGE_KEY, STORAGE_VERSION,
+)
+from .cover_cache import CoverCache
+from .delta import BooksDelta, diff_books
+from .library_scraper import BaseLibraryScraper, RenewalResult
+from .metrics import COUNTER_FAILURES, COUNTER_REFRESHES, COUNTER_UNCHANGED, METRIC_REFRESH, RefreshMetrics
+from .scheduler import RefreshScheduler, adaptive_update_interval
 from .models import LibraryBook
+from .snapshot import BooksSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,38 +33,297 @@ class LibraryBooksCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant, 
         scraper: BaseLibraryScraper, 
         name: str, 
-        update_interval: timedelta = timedelta(hours=6)
+        update_interval: timedelta = timedelta(hours=6),
+        entry_id: Optional[str] = None,
+        scheduler: Optional[RefreshScheduler] = None,
+        adaptive_interval: Optional[Tuple[timedelta, timedelta]] = None,
+        cover_cache: Optional[CoverCache] = None,
     ):
         """Initialize."""
         self.scraper = scraper
         self.library_name = name
         self.books: List[LibraryBook] = []
+        self.entry_id = entry_id
+        
+        # Domain-wide scheduler that caps, coalesces and staggers refreshes
+        self._scheduler = scheduler
+        self._base_update_interval = update_interval
+        # (floor, ceiling) for the due-date-driven interval, or None for a fixed interval
+        self._adaptive_interval = adaptive_interval
+        
+        # Domain-wide cover cache, told about new loans so their covers are prefetched
+        self._cover_cache = cover_cache
+        
+        # Persist the scraper session so a restart doesn't force a fresh login
+        self._store: Optional[Store] = (
+            Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry_id=entry_id)) if entry_id else None
+        )
+        self._stored: Dict[str, Any] = {}
+        
+        # True while the data shown is the cached book list from a previous run
+        self.stale = False
+        
+        # Loans added, removed and changed by the last refresh that changed anything
+        self.last_delta: Optional[BooksDelta] = None
+        
+        # Due-date index over self.data, rebuilt only when the data changes
+        self._index = BookIndex()
+        self._index_source: Optional[List[LibraryBook]] = None
+        
+        # Refresh timings and outcomes, shared with the scraper's stage timings
+        self.metrics: RefreshMetrics = scraper.metrics
+        self._metrics_listeners: List[Callable[[], None]] = []
+        
+        # Values shared by the sensors, rebuilt on each update and at midnight
+        self._snapshot: Optional[BooksSnapshot] = None
+        self._snapshot_source: Optional[List[LibraryBook]] = None
         
         super().__init__(
             hass,
             _LOGGER,
             name=f"Library Books {name}",
             update_interval=update_interval,
+            # Unchanged data doesn't notify listeners, so entities don't write state again
+            always_update=False,
         )
 
     async def _async_update_data(self) -> List[LibraryBook]:
         """Fetch data from API."""
+        # While cached data is shown every refresh notifies listeners, so clearing
+        # the stale flag reaches the entities even if the books are unchanged
+        self.always_update = self.stale
+        
+        self.metrics.increment(COUNTER_REFRESHES)
         try:
-            books = await self.scraper.get_books_with_retry(max_retries=2, force_login=True)
-            
-            # Add library name to books for multi-library setups
-            for book in books:
-                book.library_name = self.library_name
-                
-            return books
+            with self.metrics.time(METRIC_REFRESH):
+                if self._scheduler is None:
+                    books = await self._async_fetch_books()
+                else:
+                    books = await self._scheduler.async_run(
+                        self.entry_id or self.library_name, self.scraper.library_url, self._async_fetch_books
+                    )
+        except Exception:
+            self.metrics.increment(COUNTER_FAILURES)
+            raise
+        finally:
+            # Unchanged refreshes don't notify entities, so metrics have their own listeners
+            for update_callback in list(self._metrics_listeners):
+                update_callback()
+        
+        interval = self._base_update_interval
+        if self._adaptive_interval:
+            interval = adaptive_update_interval(books, *self._adaptive_interval, dt_util.now().date())
+            _LOGGER.debug(f"Next refresh in {interval} based on nearest due date")
+        if self._scheduler is not None:
+            # Jitter the next refresh so accounts that started together drift apart
+            interval = self._scheduler.jittered_interval(interval)
+        self.update_interval = interval
+        self.stale = False
+        return books
+    
+    async def _async_fetch_books(self) -> List[LibraryBook]:
+        """Fetch books from the library."""
+        try:
+            # Reuse the existing session; the scraper logs in again only when it has expired
+            books = await self.scraper.get_books_with_retry(max_retries=2, force_login=False)
+            return await self._async_process_books(books)
             
         except Exception as ex:
             _LOGGER.warning(f"Failed to fetch library books: {ex}")
             # Raise UpdateFailed but keep entities available with last known state
             raise UpdateFailed(f"Error fetching library books: {ex}")
     
-    # Renewal functionality is disabled for now
-    # async def renew_book(self, book: LibraryBook) -> bool:
-    #    """Renew a library book."""
-    #    _LOGGER.warning("Book renewal functionality is not yet implemented")
-    #    return False
\ No newline at end of file
+    async def _async_process_books(self, books: List[LibraryBook]) -> List[LibraryBook]:
+        """Return the books to store as data, keeping the current list if nothing changed."""
+        if self.scraper.last_fetch_unchanged and self.data is not None:
+            _LOGGER.debug("Library books unchanged, keeping current data")
+            self.metrics.increment(COUNTER_UNCHANGED)
+            await self._async_save_state()
+            return self.data
+        
+        # Add library name to books for multi-library setups
+        for book in books:
+            book.library_name = self.library_name
+        
+        if self.data is not None and books == self.data:
+            # Reparsed but identical, so keep the current list and its derived values
+            _LOGGER.debug("Library books reparsed but identical, keeping current data")
+            self.metrics.increment(COUNTER_UNCHANGED)
+            await self._async_save_state()
+            return self.data
+        
+        if self.data is not None:
+            self._async_fire_delta(diff_books(self.data, books))
+        
+        await self._async_save_state(books)
+        self._prefetch_covers(books)
+            
+        return books
+    
+    @property
+    def index(self) -> BookIndex:
+        """Return the due-date index of the current books."""
+        if self.data is not self._index_source:
+            self._index = BookIndex(self.data or [])
+            self._index_source = self.data
+        return self._index
+    
+    @property
+    def snapshot(self) -> BooksSnapshot:
+        """Return the counts and attributes for the current books and date."""
+        today = dt_util.now().date()
+        if (
+            self._snapshot is None
+            or self.data is not self._snapshot_source
+            or self._snapshot.today != today
+        ):
+            self._snapshot = BooksSnapshot(self.data, today, self._signed_cover_url)
+            self._snapshot_source = self.data
+        return self._snapshot
+    
+    def _signed_cover_url(self, isbn: str) -> str:
+        """Return a cover URL that only this Home Assistant instance can have issued."""
+        # Signed for the content user, as the snapshot is shared by everyone viewing the entities
+        return async_sign_path(
+            self.hass,
+            COVER_URL.format(isbn=isbn),
+            timedelta(days=COVER_URL_EXPIRATION_DAYS),
+            use_content_user=True,
+        )
+    
+    async def async_startup_refresh(self) -> None:
+        """
+        Refresh restored books after a random delay.
+        
+        Every restored account would otherwise refresh the moment Home Assistant
+        starts; the scheduler's delay spreads them out.
+        """
+        if self._scheduler is not None:
+            delay = self._scheduler.startup_delay()
+            _LOGGER.debug(f"First refresh of {self.library_name} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+        await self.async_refresh()
+    
+    async def async_full_refresh(self) -> None:
+        """
+        Refresh without any shortcuts and update every entity.
+        
+        The scheduler's recent result and the scraper's unchanged-payload checks are
+        bypassed, so the whole download, parse and entity update runs.
+        """
+        if self._scheduler is not None:
+            self._scheduler.forget(self.entry_id or self.library_name)
+        self.scraper.forget_last_fetch()
+        await self.async_refresh()
+        # Equal books don't notify entities, so update them explicitly
+        self.async_update_listeners()
+    
+    @callback
+    def async_add_metrics_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Call update_callback after every refresh attempt; returns a function to remove it."""
+        self._metrics_listeners.append(update_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            self._metrics_listeners.remove(update_callback)
+        
+        return remove_listener
+    
+    @callback
+    def async_handle_midnight(self, now) -> None:
+        """Let entities recompute overdue values when the date rolls over."""
+        self._snapshot = None
+        self.async_update_listeners()
+    
+    async def async_restore(self) -> bool:
+        """
+        Restore the scraper session and last known books saved by a previous run.
+        
+        Returns True if cached books were restored; they are marked as stale until
+        the next successful refresh.
+        """
+        if not self._store:
+            return False
+        
+        self._stored = await self._store.async_load() or {}
+        cookies = self._stored.get("cookies", [])
+        if cookies:
+            _LOGGER.debug(f"Restoring {len(cookies)} session cookies")
+            self.scraper.import_cookies(cookies)
+        
+        if "books" not in self._stored:
+            return False
+        
+        books = [LibraryBook.from_dict(book) for book in self._stored["books"]]
+        _LOGGER.debug(f"Restored {len(books)} cached books")
+        self._prefetch_covers(books)
+        self.stale = True
+        self.async_set_updated_data(books)
+        return True
+    
+    @callback
+    def _async_fire_delta(self, delta: BooksDelta) -> None:
+        """Remember the changes and fire an event if any loan really changed."""
+        if not delta:
+            return
+        self.last_delta = delta
+        _LOGGER.debug(
+            f"Loans changed: {len(delta.added)} added, {len(delta.removed)} removed, {len(delta.changed)} changed"
+        )
+        self.hass.bus.async_fire(
+            EVENT_LOANS_CHANGED,
+            {"entry_id": self.entry_id, "library": self.library_name, **delta.as_event_data()},
+        )
+    
+    def _prefetch_covers(self, books: List[LibraryBook]) -> None:
+        """Download the covers of new loans in the background."""
+        if self._cover_cache is None:
+            return
+        missing = self._cover_cache.register(books, self.entry_id or self.library_name)
+        if missing:
+            _LOGGER.debug(f"Prefetching {len(missing)} book covers")
+            self.hass.async_create_background_task(
+                self._cover_cache.async_prefetch(missing), f"{DOMAIN} cover prefetch"
+            )
+    
+    async def _async_save_state(self, books: Optional[List[LibraryBook]] = None) -> None:
+        """Persist the session cookies, and the books if given, when they changed."""
+        if not self._store:
+            return
+        
+        cookies = self.scraper.export_cookies()
+        if books is None and cookies == self._stored.get("cookies", []):
+            return
+        
+        self._stored["cookies"] = cookies
+        if books is not None:
+            self._stored["books"] = [book.to_dict() for book in books]
+        await self._store.async_save(self._stored)
+    
+    async def async_renew_books(self, barcodes: Optional[List[str]] = None) -> List[RenewalResult]:
+        """
+        Renew loans by barcode (every renewable loan if none are given).
+        
+        The scraper renews them in one session and refetches once; the refetched
+        books update the entities straight away instead of at the next poll.
+        """
+        current = self.data or []
+        if barcodes is None:
+            books = [book for book in current if book.renewable]
+            unknown = []
+        else:
+            by_barcode = {book.barcode: book for book in current}
+            books = [by_barcode[barcode] for barcode in barcodes if barcode in by_barcode]
+            unknown = [
+                RenewalResult(barcode, "", False, "Not on loan") for barcode in barcodes if barcode not in by_barcode
+            ]
+        
+        results, refetched = await self.scraper.renew_books(books)
+        if refetched is not None:
+            # A refresh coalesced with the one before the renewal would bring back the old due dates
+            if self._scheduler is not None:
+                self._scheduler.forget(self.entry_id or self.library_name)
+            books = await self._async_process_books(refetched)
+            self.stale = False
+            self.async_set_updated_data(books)
+        return results + unknown
\ No newline at end of file
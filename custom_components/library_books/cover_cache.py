@@ -0,0 +1,230 @@
+"""Local cache of book cover images, shared by every library account."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import re
+
+from .models import LibraryBook
+
+_LOGGER = logging.getLogger(__name__)
+
+# Total size of the cover files kept on disk
+COVER_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# Covers larger than this are not cached
+COVER_MAX_BYTES = 1024 * 1024
+# Seconds to wait for a cover download
+COVER_REQUEST_TIMEOUT = 30
+# Number of covers downloaded at the same time when prefetching
+COVER_PREFETCH_CONCURRENCY = 2
+
+_ISBN = re.compile(r'^[0-9X]{10,13}$')
+_CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+_EXTENSIONS = {content_type: ext for ext, content_type in _CONTENT_TYPES.items()}
+
+# Downloads a cover URL, returning (content, content type) or None
+CoverFetcher = Callable[[str], Awaitable[Optional[Tuple[bytes, str]]]]
+
+def cover_key(isbn: Optional[str]) -> Optional[str]:
+    """Normalise an ISBN to the key covers are stored under, or None if it isn't valid."""
+    if not isbn:
+        return None
+    key = isbn.replace("-", "").replace(" ", "").upper()
+    return key if _ISBN.match(key) else None
+
+class CoverCache:
+    """
+    Cover images keyed by ISBN, kept on disk with least-recently-used eviction.
+
+    The same ISBN borrowed on several accounts is downloaded once. Only covers of
+    books currently on loan are served, so the cache can't be used to fetch
+    arbitrary URLs or to find out which returned books are still cached.
+    """
+
+    def __init__(self, directory: str, fetch: CoverFetcher, max_bytes: int = COVER_CACHE_MAX_BYTES):
+        """Initialize the cache."""
+        self._directory = Path(directory)
+        self._fetch = fetch
+        self._max_bytes = max_bytes
+        # ISBN -> (file name, size), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        # ISBN -> cover URL at the library
+        self._sources: Dict[str, str] = {}
+        # Account -> ISBNs of its current loans
+        self._loans: Dict[Hashable, Set[str]] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(COVER_PREFETCH_CONCURRENCY)
+
+    @property
+    def total_bytes(self) -> int:
+        """Return the size of the cached covers."""
+        return self._total_bytes
+
+    def __contains__(self, isbn: str) -> bool:
+        return cover_key(isbn) in self._entries
+
+    def load(self) -> None:
+        """Index the covers already on disk (blocking)."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self._directory.iterdir():
+            if path.suffix in _CONTENT_TYPES and cover_key(path.stem) == path.stem:
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, path.name, stat.st_size))
+
+        self._entries.clear()
+        self._total_bytes = 0
+        evicted = []
+        for _, key, name, size in sorted(files):
+            evicted.extend(self._add(key, name, size))
+        self._delete_files(evicted)
+        _LOGGER.debug(f"Loaded {len(self._entries)} cached covers ({self._total_bytes} bytes)")
+
+    async def async_load(self) -> None:
+        """Index the covers already on disk."""
+        await asyncio.get_running_loop().run_in_executor(None, self.load)
+
+    def register(self, books: Iterable[LibraryBook], owner: Hashable = None) -> List[str]:
+        """
+        Set the current loans of an account and remember where each cover comes from.
+
+        Replaces the loans previously registered for owner. Returns the keys not
+        cached yet.
+        """
+        missing = []
+        keys = set()
+        for book in books:
+            key = cover_key(book.isbn)
+            if key is None or not book.image_url:
+                continue
+            keys.add(key)
+            self._sources[key] = book.image_url
+            if key not in self._entries and key not in missing:
+                missing.append(key)
+        self._loans[owner] = keys
+        return missing
+
+    def forget(self, owner: Hashable = None) -> None:
+        """Drop the loans of an account, e.g. when it is unloaded."""
+        self._loans.pop(owner, None)
+
+    def is_on_loan(self, isbn: str) -> bool:
+        """Return True if any account currently has the book on loan."""
+        key = cover_key(isbn)
+        return any(key in keys for keys in self._loans.values())
+
+    async def async_get(self, isbn: str) -> Optional[Tuple[bytes, str]]:
+        """Return (content, content type) for the cover of a book on loan, downloading it on a cache miss."""
+        key = cover_key(isbn)
+        if key is None or not self.is_on_loan(key):
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            content = await asyncio.get_running_loop().run_in_executor(None, self._read_file, entry[0])
+            if content is not None:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                return content, _CONTENT_TYPES[Path(entry[0]).suffix]
+            # The file went missing, so drop it and download it again
+            if self._entries.get(key) == entry:
+                del self._entries[key]
+                self._total_bytes -= entry[1]
+
+        if key not in self._sources:
+            return None
+        return await self._async_download(key)
+
+    async def async_prefetch(self, keys: Iterable[str]) -> None:
+        """Download covers in the background; failures are only logged."""
+        await asyncio.gather(*(self._async_download(key) for key in keys))
+
+    async def _async_download(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Download a cover once, sharing the result with concurrent requests."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._async_fetch_and_store(key))
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _async_fetch_and_store(self, key: str) -> Optional[Tuple[bytes, str]]:
+        url = self._sources[key]
+        try:
+            async with self._semaphore:
+                cover = await self._fetch(url)
+        except Exception as ex:
+            _LOGGER.debug(f"Failed to download cover {key}: {ex}")
+            return None
+
+        if cover is None:
+            return None
+        content, content_type = cover
+        content_type = content_type.split(";")[0].strip().lower()
+        if content_type not in _EXTENSIONS or not content or len(content) > COVER_MAX_BYTES:
+            _LOGGER.debug(f"Not caching cover {key} ({content_type}, {len(content)} bytes)")
+            return None
+
+        loop = asyncio.get_running_loop()
+        name = key + _EXTENSIONS[content_type]
+        try:
+            await loop.run_in_executor(None, self._write_file, name, content)
+        except OSError as ex:
+            _LOGGER.warning(f"Failed to cache cover {key}: {ex}")
+            return content, content_type
+
+        # The index is only changed on the event loop; file removal happens in the executor
+        evicted = self._add(key, name, len(content))
+        if evicted:
+            await loop.run_in_executor(None, self._delete_files, evicted)
+        return content, content_type
+
+    def _add(self, key: str, name: str, size: int) -> List[str]:
+        """Add a cover to the index and return the files to delete to stay under the limit."""
+        evicted = []
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._total_bytes -= previous[1]
+            if previous[0] != name:
+                evicted.append(previous[0])
+
+        self._entries[key] = (name, size)
+        self._total_bytes += size
+        while self._total_bytes > self._max_bytes and len(self._entries) > 1:
+            _, (old_name, old_size) = self._entries.popitem(last=False)
+            self._total_bytes -= old_size
+            evicted.append(old_name)
+        return evicted
+
+    def _read_file(self, name: str) -> Optional[bytes]:
+        """Read a cached cover and mark it as recently used (blocking)."""
+        path = self._directory / name
+        try:
+            content = path.read_bytes()
+            # The modification time keeps the LRU order across restarts
+            os.utime(path)
+        except OSError:
+            return None
+        return content
+
+    def _write_file(self, name: str, content: bytes) -> None:
+        """Write a cover atomically (blocking)."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self._directory / (name + ".tmp")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, self._directory / name)
+
+    def _delete_files(self, names: List[str]) -> None:
+        """Delete evicted covers (blocking)."""
+        for name in names:
+            try:
+                (self._directory / name).unlink()
+            except OSError:
+                pass
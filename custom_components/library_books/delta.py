@@ -0,0 +1,86 @@
+"""Differences between two refreshes of the same library account."""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .models import LibraryBook
+
+# Loan fields compared between refreshes; catalogue details such as the title aren't
+TRACKED_FIELDS = ("due_date", "renewal_count", "renewable", "fine_amount")
+
+@dataclass
+class LoanChange:
+    """A loan present in both refreshes whose tracked fields differ."""
+    previous: LibraryBook
+    current: LibraryBook
+    fields: Tuple[str, ...]
+
+    @property
+    def renewed(self) -> bool:
+        """Return True if the loan looks renewed: more renewals or a later due date."""
+        if self.current.renewal_count > self.previous.renewal_count:
+            return True
+        return (
+            self.current.due_date is not None
+            and self.previous.due_date is not None
+            and self.current.due_date > self.previous.due_date
+        )
+
+@dataclass
+class BooksDelta:
+    """Loans added, removed and changed between two refreshes."""
+    added: List[LibraryBook] = field(default_factory=list)
+    removed: List[LibraryBook] = field(default_factory=list)
+    changed: List[LoanChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def as_event_data(self) -> Dict[str, Any]:
+        """Return a compact, JSON-serialisable summary for an event."""
+        return {
+            "added": [_loan_summary(book) for book in self.added],
+            "removed": [_loan_summary(book) for book in self.removed],
+            "changed": [
+                {
+                    **_loan_summary(change.current),
+                    "renewed": change.renewed,
+                    "changes": {
+                        name: [_serialise(getattr(change.previous, name)), _serialise(getattr(change.current, name))]
+                        for name in change.fields
+                    },
+                }
+                for change in self.changed
+            ],
+        }
+
+def loan_key(book: LibraryBook) -> Hashable:
+    """Return the key a loan is matched on: its barcode, or title and author without one."""
+    return book.barcode or (book.title, book.author)
+
+def diff_books(previous: Optional[Sequence[LibraryBook]], current: Sequence[LibraryBook]) -> BooksDelta:
+    """Compare two book lists by barcode."""
+    previous_by_key = {loan_key(book): book for book in previous or ()}
+    current_by_key = {loan_key(book): book for book in current}
+
+    delta = BooksDelta()
+    for key, book in current_by_key.items():
+        old = previous_by_key.get(key)
+        if old is None:
+            delta.added.append(book)
+            continue
+        fields = tuple(name for name in TRACKED_FIELDS if getattr(old, name) != getattr(book, name))
+        if fields:
+            delta.changed.append(LoanChange(old, book, fields))
+
+    delta.removed = [book for key, book in previous_by_key.items() if key not in current_by_key]
+    return delta
+
+def _loan_summary(book: LibraryBook) -> Dict[str, Any]:
+    summary = {"barcode": book.barcode, "title": book.title, "due_date": _serialise(book.due_date)}
+    if book.member:
+        summary["member"] = book.member
+    return summary
+
+def _serialise(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
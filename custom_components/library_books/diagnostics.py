@@ -0,0 +1,46 @@
+"""Diagnostics support for the Library Books integration."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .aggregate import LibraryBooksAggregate
+from .const import DOMAIN, CONF_USERNAME, CONF_PASSWORD
+from .coordinator import LibraryBooksCoordinator
+from .library_scraper import host_key
+from .retry import circuit_breaker
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if isinstance(hass.data[DOMAIN][entry.entry_id], LibraryBooksAggregate):
+        aggregate: LibraryBooksAggregate = hass.data[DOMAIN][entry.entry_id]
+        return {
+            "libraries": len(aggregate.coordinators),
+            "books": len(aggregate.index),
+            "stale": aggregate.stale,
+        }
+
+    coordinator: LibraryBooksCoordinator = hass.data[DOMAIN][entry.entry_id]
+    breaker = circuit_breaker(host_key(coordinator.scraper.library_url))
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "stale": coordinator.stale,
+            "books": len(coordinator.data or []),
+        },
+        "circuit_breaker": {
+            "failures": breaker.failures,
+            "open": breaker.is_open,
+            "seconds_until_retry": round(breaker.remaining),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+    }
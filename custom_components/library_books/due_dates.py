@@ -0,0 +1,66 @@
+"""Due-date parsing with per-payload format detection."""
+from datetime import date, datetime
+from typing import Callable, Dict, Optional
+
+def _parse_iso(value: str) -> Optional[date]:
+    """Parse "2025-07-01", or the date part of "2025-07-01T00:00:00Z"; None if the shape differs."""
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-" and (len(value) == 10 or value[10] in "T "):
+        return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    return None
+
+def _parse_dmy(value: str) -> Optional[date]:
+    """Parse "01/07/2025"; None if the shape differs."""
+    if len(value) == 10 and value[2] == "/" and value[5] == "/":
+        return date(int(value[6:10]), int(value[3:5]), int(value[0:2]))
+    return None
+
+# Known formats, in detection order
+DUE_DATE_FORMATS: Dict[str, Callable[[str], Optional[date]]] = {
+    "iso": _parse_iso,
+    "dmy": _parse_dmy,
+}
+
+def parse_due_date_fallback(value: str) -> date:
+    """Parse a due date the slow way, trying each supported format in turn."""
+    if 'T' in value:
+        # ISO format with time
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return datetime.strptime(value, "%d/%m/%Y").date()
+
+class DueDateParser:
+    """
+    Parse the due dates of one payload.
+
+    The format is detected from the first date and then tried first for every
+    other one; values that don't match it fall back to detection and then to
+    parse_due_date_fallback. Loans are issued in batches, so repeated strings
+    are answered from a memo.
+    """
+
+    def __init__(self, date_format: Optional[str] = None):
+        """Initialize the parser, optionally with the format detected for an earlier payload."""
+        self.format = date_format if date_format in DUE_DATE_FORMATS else None
+        self._memo: Dict[str, date] = {}
+
+    def parse(self, value: str) -> date:
+        """Parse a due date, raising ValueError if no format matches."""
+        parsed = self._memo.get(value)
+        if parsed is not None:
+            return parsed
+
+        if self.format is not None:
+            parsed = DUE_DATE_FORMATS[self.format](value)
+        if parsed is None:
+            for name, parse in DUE_DATE_FORMATS.items():
+                parsed = parse(value)
+                if parsed is not None:
+                    self.format = name
+                    break
+            else:
+                parsed = parse_due_date_fallback(value)
+
+        self._memo[value] = parsed
+        return parsed
@@ -1,16 +1,49 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import datetime, date
-from typing import List, Dict, Optional, Any
+from typing import Iterable, List, Dict, Optional, Any, Tuple
+from urllib.parse import urlsplit
 import logging
 import asyncio
 
+from .metrics import COUNTER_CIRCUIT_OPEN, COUNTER_RETRIES, RefreshMetrics
 from .models import LibraryBook
+from .retry import STAGE_LOGIN, CircuitOpenError, FetchError, circuit_breaker, retry_delay
 
 _LOGGER = logging.getLogger(__name__)
 
+# Number of renewal requests sent at the same time within one batch
+RENEW_CONCURRENCY = 3
+
+@dataclass
+class RenewalResult:
+    """Outcome of renewing one loan."""
+    barcode: Optional[str]
+    title: str
+    renewed: bool
+    message: Optional[str] = None
+    # Due date after the batch, from the refetch
+    due_date: Optional[date] = None
+
+def normalize_library_url(url: str) -> str:
+    """Ensure the library URL has https:// and no trailing slash."""
+    url = url.strip()
+    if not url.startswith("http://") and not url.startswith("https://"):
+        url = "https://" + url
+    url = url.rstrip("/")
+    return url
+
+def host_key(library_url: str) -> str:
+    """Return the scheme and host of a library URL, used to group accounts by server."""
+    parts = urlsplit(normalize_library_url(library_url))
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
 class BaseLibraryScraper(ABC):
     """Base class for library website scrapers."""
     
+    # Set by scrapers whose renew_book actually renews
+    renewal_supported = False
+    
     def __init__(self, library_url: str, username: str, password: str, session=None):
         """
         Initialize the scraper.
@@ -25,6 +58,10 @@ class BaseLibraryScraper(ABC):
         self.username = username
         self.password = password
         self.session = session
+        # Set by scrapers when the last fetch returned the same books as the one before
+        self.last_fetch_unchanged = False
+        # Stage timings and payload sizes, recorded by the scrapers
+        self.metrics = RefreshMetrics()
     
     @abstractmethod
     async def login(self) -> bool:
@@ -41,6 +78,60 @@ class BaseLibraryScraper(ABC):
         """Attempt to renew a book. Returns True if successful."""
         pass
 
+    async def renew_books(self, books: Iterable[LibraryBook]) -> Tuple[List[RenewalResult], Optional[List[LibraryBook]]]:
+        """
+        Renew several loans in one authenticated session.
+        
+        Logs in once, sends up to RENEW_CONCURRENCY renewals at a time, then fetches
+        the books once so the results carry the new due dates. Returns the per-book
+        results and the refetched books (None if nothing was renewed).
+        """
+        books = list(books)
+        if not self.renewal_supported:
+            return [
+                RenewalResult(book.barcode, book.title, False, "Renewal isn't supported for this library system")
+                for book in books
+            ], None
+        if not books:
+            return [], None
+        
+        if not await self.login():
+            raise FetchError("Authentication failed", STAGE_LOGIN, retryable=False)
+        
+        semaphore = asyncio.Semaphore(RENEW_CONCURRENCY)
+        
+        async def renew(book: LibraryBook) -> RenewalResult:
+            async with semaphore:
+                try:
+                    renewed = await self.renew_book(book)
+                except Exception as e:
+                    _LOGGER.warning(f"Failed to renew {book.barcode}: {e}")
+                    return RenewalResult(book.barcode, book.title, False, str(e))
+            return RenewalResult(book.barcode, book.title, renewed, None if renewed else "Renewal refused by the library")
+        
+        results = list(await asyncio.gather(*(renew(book) for book in books)))
+        if not any(result.renewed for result in results):
+            return results, None
+        
+        # One fetch for the whole batch, reusing the session from the login above
+        refetched = await self.get_outstanding_books(force_login=False)
+        due_dates = {book.barcode: book.due_date for book in refetched}
+        for result in results:
+            result.due_date = due_dates.get(result.barcode)
+        return results, refetched
+
+    def export_cookies(self) -> List[Dict[str, Any]]:
+        """Export session cookies so the session can be reused after a restart."""
+        return []
+
+    def import_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """Restore session cookies previously returned by export_cookies."""
+        pass
+
+    def forget_last_fetch(self) -> None:
+        """Forget the last payload, so the next fetch downloads and parses it in full."""
+        pass
+
     async def logout(self) -> None:
         """Logout from the library system."""
         def close_session():
@@ -53,28 +144,67 @@ class BaseLibraryScraper(ABC):
             self.session = None
     
     async def get_books_with_retry(self, max_retries: int = 3, force_login: bool = True) -> List[LibraryBook]:
-        """Get outstanding books with retry logic."""
+        """
+        Get outstanding books with retry logic.
+        
+        A FetchError names the stage that failed, so a retry after a failed fetch
+        reuses the session instead of logging in again. Errors that retrying can't
+        fix are raised straight away, and repeated failures open the host's
+        circuit breaker so later refreshes fail fast until it cools down.
+        """
+        breaker = circuit_breaker(host_key(self.library_url))
+        if not breaker.allow_request():
+            self.metrics.increment(COUNTER_CIRCUIT_OPEN)
+            raise CircuitOpenError(
+                f"{host_key(self.library_url)} has been failing, next attempt in {breaker.remaining:.0f}s"
+            )
+        
+        login = force_login
         last_exception = None
+        attempts = 0
         
         for attempt in range(max_retries):
+            attempts += 1
             try:
                 _LOGGER.debug(f"Fetching books, attempt {attempt + 1}/{max_retries}")
-                books = await self.get_outstanding_books(force_login=force_login)
+                books = await self.get_outstanding_books(force_login=login)
                 _LOGGER.debug(f"Successfully fetched {len(books)} books")
+                breaker.record_success()
                 return books
                     
+            except FetchError as e:
+                last_exception = e
+                _LOGGER.warning(f"Attempt {attempt + 1}/{max_retries} failed at {e.stage}: {e}")
+                if e.stage != STAGE_LOGIN:
+                    # Login got through, so only the failed stage needs repeating
+                    login = False
+                if not e.retryable:
+                    # The host answered, so it isn't down: close the circuit (and end a
+                    # trial) rather than keep other accounts on this host locked out
+                    breaker.record_success()
+                    break
+                breaker.record_failure(e.retry_after)
+                delay = retry_delay(attempt, e.retry_after)
+                
             except Exception as e:
                 last_exception = e
                 _LOGGER.warning(f"Attempt {attempt + 1}/{max_retries} failed: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                breaker.record_failure()
+                delay = retry_delay(attempt)
+            
+            if breaker.is_open:
+                _LOGGER.warning(f"Too many failures, pausing refreshes for {breaker.remaining:.0f}s")
+                break
+            if attempt < max_retries - 1:
+                self.metrics.increment(COUNTER_RETRIES)
+                await asyncio.sleep(delay)
         
         # All retries failed
         if last_exception:
-            _LOGGER.error(f"All {max_retries} attempts failed. Last error: {last_exception}")
+            _LOGGER.error(f"Giving up after {attempts} of {max_retries} attempts. Last error: {last_exception}")
             raise last_exception
         else:
             # This shouldn't happen, but just in case
             error_msg = f"All {max_retries} attempts failed with no exception captured"
             _LOGGER.error(error_msg)
-            raise Exception(error_msg)
\ No newline at end of file
+            raise Exception(error_msg)
@@ -0,0 +1,104 @@
+"""Rolling timing and size statistics for library refreshes."""
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+import math
+import time
+
+# Number of recent samples each histogram keeps
+METRICS_WINDOW = 100
+
+# Histograms (seconds unless noted)
+METRIC_LOGIN = "login"
+METRIC_FETCH = "fetch"
+METRIC_PARSE = "parse"
+METRIC_REFRESH = "refresh"
+METRIC_PAYLOAD_BYTES = "payload_bytes"
+
+# Counters
+COUNTER_REFRESHES = "refreshes"
+COUNTER_FAILURES = "failures"
+COUNTER_UNCHANGED = "unchanged"
+COUNTER_RETRIES = "retries"
+COUNTER_CIRCUIT_OPEN = "circuit_open"
+
+class RollingHistogram:
+    """The most recent samples of one measurement, summarised on demand."""
+
+    def __init__(self, size: int = METRICS_WINDOW):
+        """Initialize the histogram."""
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.total_count = 0
+
+    def add(self, value: float) -> None:
+        """Record a sample, dropping the oldest once the window is full."""
+        self._samples.append(value)
+        self.total_count += 1
+
+    @property
+    def last(self) -> Optional[float]:
+        """Return the most recent sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return a percentile (nearest rank) of the samples in the window."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = math.ceil(percent / 100 * len(ordered)) - 1
+        return ordered[max(0, min(len(ordered) - 1, rank))]
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, last, min, max, mean, p50 and p95 of the window."""
+        if not self._samples:
+            return {"count": self.total_count}
+        return {
+            "count": self.total_count,
+            "last": round(self.last, 4),
+            "min": round(min(self._samples), 4),
+            "max": round(max(self._samples), 4),
+            "mean": round(sum(self._samples) / len(self._samples), 4),
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+        }
+
+class RefreshMetrics:
+    """Per-stage timings, payload sizes and outcome counters for one library account."""
+
+    def __init__(self, window: int = METRICS_WINDOW, clock: Callable[[], float] = time.perf_counter):
+        """Initialize the metrics."""
+        self._window = window
+        self._clock = clock
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    def record(self, name: str, value: float) -> None:
+        """Add a sample to a histogram."""
+        if name not in self.histograms:
+            self.histograms[name] = RollingHistogram(self._window)
+        self.histograms[name].add(value)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Record how long the block takes, whether or not it raises."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - start)
+
+    def last(self, name: str) -> Optional[float]:
+        """Return the latest sample of a histogram."""
+        histogram = self.histograms.get(name)
+        return histogram.last if histogram else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return every histogram summary and counter."""
+        return {
+            "histograms": {name: histogram.summary() for name, histogram in self.histograms.items()},
+            "counters": dict(self.counters),
+        }
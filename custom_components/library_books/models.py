@@ -1,9 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import date
-from typing import Optional
+from typing import Any, Dict, Optional
 import re
+import sys
 
-@dataclass
+# Trailing whitespace and slashes left over from catalogue records
+_TRAILING_JUNK = re.compile(r'[\s/]+$')
+
+# Slotted instances have no per-instance __dict__ (dataclass slots need Python 3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LibraryBook:
     """Represents a library book with due date information."""
     title: str
@@ -16,29 +23,49 @@ class LibraryBook:
     renewal_count: int = 0
     fine_amount: float = 0.0
     library_name: Optional[str] = None
+    # Household member the book is on loan to, for cards covering several people
+    member: Optional[str] = None
     
     def __post_init__(self):
         """Clean up title and author after initialization."""
         # Remove trailing whitespace and special characters from title
         if self.title:
-            self.title = re.sub(r'[\s/]+$', '', self.title.strip())
+            self.title = _TRAILING_JUNK.sub('', self.title.strip())
         
-        # Also clean up author for consistency
+        # Also clean up author for consistency; authors repeat across books, so intern them
         if self.author:
-            self.author = re.sub(r'[\s/]+$', '', self.author.strip())
+            self.author = sys.intern(_TRAILING_JUNK.sub('', self.author.strip()))
+        
+        if self.library_name:
+            self.library_name = sys.intern(self.library_name)
+        
+        if self.member:
+            self.member = sys.intern(self.member)
     
     def __str__(self) -> str:
         """String representation of the book."""
         return f"{self.title} by {self.author} (Due: {self.due_date})"
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serialisable dict."""
+        data = asdict(self)
+        data["due_date"] = self.due_date.isoformat() if self.due_date else None
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LibraryBook":
+        """Create a book from a dict returned by to_dict."""
+        data = dict(data)
+        if data.get("due_date"):
+            data["due_date"] = date.fromisoformat(data["due_date"])
+        return cls(**data)
+    
     @property
     def is_overdue(self) -> bool:
         """Check if the book is overdue."""
-        from datetime import date
         return self.due_date < date.today()
     
     @property
     def days_until_due(self) -> int:
         """Get number of days until due (negative if overdue)."""
-        from datetime import date
         return (self.due_date - date.today()).days
\ No newline at end of file
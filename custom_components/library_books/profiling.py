@@ -0,0 +1,74 @@
+"""CPU and allocation profiling of a single refresh cycle."""
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Tuple
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+# Number of functions and allocation sites listed in the report
+PROFILE_TOP = 40
+# Stack depth recorded for each allocation
+PROFILE_TRACEMALLOC_FRAMES = 10
+
+async def async_profile(run: Callable[[], Awaitable[Any]], top: int = PROFILE_TOP) -> Tuple[str, cProfile.Profile]:
+    """
+    Run a coroutine under cProfile and tracemalloc.
+
+    cProfile only sees the event loop thread, so work done in the executor (such
+    as requests transport I/O) shows up as time spent waiting for it. Exceptions
+    from run are recorded in the report rather than raised.
+
+    Returns the text report and the profiler, whose stats can be dumped for
+    tools such as snakeviz.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+
+    profiler = cProfile.Profile()
+    error = None
+    start = time.perf_counter()
+    try:
+        # Inside the try so tracing is stopped if another profiler is already active
+        profiler.enable()
+        try:
+            await run()
+        except Exception as ex:
+            error = ex
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+
+    lines = [
+        f"Elapsed: {elapsed:.3f}s",
+        f"Peak traced memory: {peak / 1024:.1f} KiB",
+        f"Error: {error!r}" if error else "Completed without error",
+        "",
+        f"== Top {top} functions by cumulative time ==",
+    ]
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    lines.append(stream.getvalue())
+
+    lines.append(f"== Top {top} allocation sites by growth ==")
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    lines.extend(str(difference) for difference in differences[:top])
+
+    return "\n".join(lines) + "\n", profiler
+
+def write_profile(directory: str, name: str, report: str, profiler: cProfile.Profile) -> Tuple[str, str]:
+    """Write the text report and the raw stats (blocking); returns both paths."""
+    report_path = Path(directory) / f"{name}.txt"
+    stats_path = Path(directory) / f"{name}.prof"
+    report_path.write_text(report, encoding="utf-8")
+    profiler.dump_stats(str(stats_path))
+    return str(report_path), str(stats_path)
@@ -0,0 +1,21 @@
+"""Shared connection pools for the requests transport."""
+import requests
+from requests.adapters import HTTPAdapter
+
+class PooledRequestsSession(requests.Session):
+    """A requests session whose connection pool is shared with other accounts."""
+
+    def __init__(self, prefix: str, adapter: HTTPAdapter):
+        super().__init__()
+        self._shared_adapter = adapter
+        self.mount(f"{prefix}/", adapter)
+
+    def close(self) -> None:
+        """Close the session without closing the shared pool."""
+        for adapter in self.adapters.values():
+            if adapter is not self._shared_adapter:
+                adapter.close()
+
+def create_adapter(pool_maxsize: int) -> HTTPAdapter:
+    """Create the connection pool shared by the sessions of one host."""
+    return HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
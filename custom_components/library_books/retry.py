@@ -0,0 +1,151 @@
+"""Retry policy and per-host circuit breaker for library refreshes."""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional
+import logging
+import random
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stages of a refresh, so a retry only repeats the stage that failed
+STAGE_LOGIN = "login"
+STAGE_FETCH = "fetch"
+STAGE_PARSE = "parse"
+
+# Backoff between attempts: RETRY_BASE_DELAY * 2 ** attempt seconds, capped, with jitter
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+# A Retry-After longer than this isn't waited for; the host's circuit opens instead
+RETRY_AFTER_MAX_WAIT = 60.0
+
+# Consecutive failures against a host before its circuit opens
+CIRCUIT_FAILURE_THRESHOLD = 5
+# Seconds an open circuit fails refreshes fast before one trial refresh is let through
+CIRCUIT_COOLDOWN = 15 * 60
+
+class FetchError(Exception):
+    """A refresh stage failed."""
+
+    def __init__(self, message: str, stage: str, retryable: bool = True, retry_after: Optional[float] = None):
+        """
+        Initialize the error.
+
+        Args:
+            stage: STAGE_LOGIN, STAGE_FETCH or STAGE_PARSE
+            retryable: False when trying again can't help, e.g. wrong credentials
+            retry_after: Seconds the server asked us to wait, if it sent Retry-After
+        """
+        super().__init__(message)
+        self.stage = stage
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_status(cls, stage: str, status: int, headers: Mapping[str, str], message: str) -> "FetchError":
+        """Create the error for an HTTP error status, retrying only server-side failures."""
+        retry_after = next(
+            (parse_retry_after(value) for key, value in headers.items() if key.lower() == "retry-after"), None
+        )
+        return cls(message, stage, retryable=status in (408, 429) or status >= 500, retry_after=retry_after)
+
+class CircuitOpenError(Exception):
+    """Refresh skipped because the library host has been failing."""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Return the seconds to wait before the next attempt.
+
+    The server's Retry-After is a minimum; otherwise the delay backs off
+    exponentially. Both get random jitter so accounts retrying together spread out.
+    """
+    if retry_after is not None:
+        return retry_after + random.uniform(0, RETRY_BASE_DELAY)
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class CircuitBreaker:
+    """
+    Fail fast against a library host that keeps failing.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures (or a Retry-After longer
+    than we are willing to wait) the circuit opens and refreshes are refused until
+    the cool-down ends. Then a single trial refresh is let through; its success
+    closes the circuit and its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self._open_until: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while refreshes are refused."""
+        return self._open_until is not None and self._clock() < self._open_until
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds until the circuit lets a trial refresh through."""
+        if self._open_until is None:
+            return 0.0
+        return max(0.0, self._open_until - self._clock())
+
+    def allow_request(self) -> bool:
+        """Return True if a refresh may run now."""
+        if self._open_until is None:
+            return True
+        now = self._clock()
+        if now < self._open_until:
+            return False
+        # Cool-down over: let this refresh through as the trial and keep the others out
+        self._open_until = now + self.cooldown
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self._open_until = None
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        """Count a failure, opening the circuit when the host looks down."""
+        self.failures += 1
+        open_for = 0.0
+        if self.failures >= self.failure_threshold:
+            open_for = self.cooldown
+        if retry_after is not None and retry_after > RETRY_AFTER_MAX_WAIT:
+            open_for = max(open_for, retry_after)
+        if open_for:
+            self._open_until = self._clock() + open_for
+
+# Host -> circuit breaker, shared by every account on that host
+_CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+def circuit_breaker(host: str) -> CircuitBreaker:
+    """Return the circuit breaker for a library host."""
+    if host not in _CIRCUIT_BREAKERS:
+        _CIRCUIT_BREAKERS[host] = CircuitBreaker()
+    return _CIRCUIT_BREAKERS[host]
@@ -0,0 +1,136 @@
+"""Domain-wide scheduling of library refreshes."""
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+import asyncio
+import logging
+import random
+import time
+
+from .library_scraper import host_key
+from .models import LibraryBook
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of scrapes running at once, across all libraries
+MAX_CONCURRENT_REFRESHES = 4
+# Maximum number of scrapes running at once against a single library host
+MAX_CONCURRENT_REFRESHES_PER_HOST = 2
+# Refresh intervals are randomised by up to this fraction in either direction
+REFRESH_JITTER = 0.1
+# A refresh requested within this many seconds of the last one reuses its result
+REFRESH_COALESCE_WINDOW = 30
+# First refreshes after startup are spread over this many seconds
+STARTUP_REFRESH_SPREAD = 120
+
+# In adaptive mode, poll this many times between now and the nearest due date
+ADAPTIVE_POLLS_BEFORE_DUE = 4
+
+def adaptive_update_interval(
+    books: Iterable[LibraryBook],
+    floor: timedelta,
+    ceiling: timedelta,
+    today: date,
+) -> timedelta:
+    """
+    Choose the next refresh interval from how soon the nearest book is due.
+
+    Accounts with nothing due for weeks are polled at the ceiling; the interval
+    shrinks as the nearest due date approaches, and books due within a day or
+    already overdue are polled at the floor. Pass today in Home Assistant's
+    time zone, so the interval agrees with the sensors about when a book is due.
+    """
+    due_dates = [book.due_date for book in books if book.due_date]
+    if not due_dates:
+        return ceiling
+
+    days_until_due = (min(due_dates) - today).days
+    if days_until_due <= 1:
+        return floor
+
+    interval = timedelta(days=days_until_due) / ADAPTIVE_POLLS_BEFORE_DUE
+    return max(floor, min(ceiling, interval))
+
+class RefreshScheduler:
+    """
+    Coordinate refreshes of all library accounts.
+
+    Refreshes are capped globally and per library host, a refresh requested while
+    another one for the same account is running (or has just finished) shares its
+    result, and refresh intervals are jittered so accounts drift apart instead of
+    hitting their libraries at the same moment.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_REFRESHES,
+        max_per_host: int = MAX_CONCURRENT_REFRESHES_PER_HOST,
+        jitter: float = REFRESH_JITTER,
+        coalesce_window: float = REFRESH_COALESCE_WINDOW,
+        startup_spread: float = STARTUP_REFRESH_SPREAD,
+    ):
+        """Initialize the scheduler."""
+        self._global_limit = asyncio.Semaphore(max_concurrent)
+        self._max_per_host = max_per_host
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._jitter = jitter
+        self._coalesce_window = coalesce_window
+        self._startup_spread = startup_spread
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # key -> (monotonic completion time, result)
+        self._recent: Dict[str, Tuple[float, Any]] = {}
+
+    def jittered_interval(self, interval: timedelta) -> timedelta:
+        """Return the interval randomised by the configured jitter."""
+        factor = random.uniform(1 - self._jitter, 1 + self._jitter)
+        return timedelta(seconds=interval.total_seconds() * factor)
+
+    def startup_delay(self) -> float:
+        """Return a random delay, in seconds, before an account's first refresh after startup."""
+        return random.uniform(0, self._startup_spread)
+
+    async def async_run(
+        self,
+        key: str,
+        library_url: str,
+        refresh: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Run a refresh for one account, subject to the concurrency limits.
+
+        Args:
+            key: Identifies the account; refreshes with the same key are coalesced
+            library_url: Used to apply the per-host limit
+            refresh: Coroutine function performing the actual refresh
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            _LOGGER.debug(f"Joining refresh already running for {key}")
+            return await asyncio.shield(in_flight)
+
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[0] < self._coalesce_window:
+            _LOGGER.debug(f"Reusing refresh for {key} that finished moments ago")
+            return recent[1]
+
+        # Run as a separate task so a cancelled caller doesn't abort a shared refresh
+        task = asyncio.ensure_future(self._async_limited(key, library_url, refresh))
+        self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def _async_limited(self, key: str, library_url: str, refresh) -> Any:
+        host = host_key(library_url)
+        host_limit = self._host_limits.setdefault(host, asyncio.Semaphore(self._max_per_host))
+        try:
+            # Wait for the host first, so refreshes queued behind a busy host don't
+            # hold global slots that refreshes for other hosts could use
+            async with host_limit, self._global_limit:
+                result = await refresh()
+            self._recent[key] = (time.monotonic(), result)
+            return result
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+
+    def forget(self, key: str) -> None:
+        """Drop any remembered result for an account, e.g. when it is unloaded."""
+        self._recent.pop(key, None)
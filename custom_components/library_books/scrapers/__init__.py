@@ -1 +1,33 @@
-"""Library scrapers package."""
\ No newline at end of file
+"""Library scrapers package."""
+import importlib
+from typing import Dict, Tuple, Type
+
+from ..library_scraper import BaseLibraryScraper
+
+# Supported library types: type -> (display name, module, scraper class).
+# Backend modules (and their HTTP dependencies) are only imported when an entry uses them.
+SCRAPERS: Dict[str, Tuple[str, str, str]] = {
+    "libero": ("Libero Library System", "libero_scraper", "LiberoLibraryScraper"),
+    # add others here, such as...
+    #"koha": ("Koha Library System", "koha_scraper", "KohaLibraryScraper"),
+    #"sirsi": ("SirsiDynix", "sirsi_scraper", "SirsiLibraryScraper"),
+    #"polaris": ("Polaris ILS", "polaris_scraper", "PolarisLibraryScraper"),
+    #"evergreen": ("Evergreen ILS", "evergreen_scraper", "EvergreenLibraryScraper"),
+}
+
+# Library type -> display name, for selection in the config flow
+LIBRARY_TYPES: Dict[str, str] = {library_type: info[0] for library_type, info in SCRAPERS.items()}
+
+def get_scraper_class(library_type: str) -> Type[BaseLibraryScraper]:
+    """
+    Import and return the scraper class for a library type.
+
+    This imports the backend module, so call it from an executor inside Home Assistant.
+    Raises ValueError for unsupported library types.
+    """
+    if library_type not in SCRAPERS:
+        raise ValueError(f"Unsupported library type: {library_type}")
+
+    _, module_name, class_name = SCRAPERS[library_type]
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, class_name)
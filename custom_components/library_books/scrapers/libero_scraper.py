@@ -1,109 +1,478 @@
-from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import hashlib
 import logging
 import json
 import requests
 import asyncio
-from ..library_scraper import BaseLibraryScraper
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # Streaming parse is optional; fall back to json.loads
+    ijson = None
+
+from ..library_scraper import BaseLibraryScraper, normalize_library_url
+from ..due_dates import DueDateParser
+from ..metrics import METRIC_FETCH, METRIC_LOGIN, METRIC_PARSE, METRIC_PAYLOAD_BYTES
 from ..models import LibraryBook
+from ..retry import STAGE_FETCH, STAGE_LOGIN, STAGE_PARSE, FetchError
 
 _LOGGER = logging.getLogger(__name__)
 
-def _normalize_library_url(url: str) -> str:
-    url = url.strip()
-    if not url.startswith("http://") and not url.startswith("https://"):
-        url = "https://" + url
-    url = url.rstrip("/")
-    return url
+# Timeout (in seconds) applied to every request made by the scraper
+REQUEST_TIMEOUT = 30
+
+# Size of the chunks read from the response body
+STREAM_CHUNK_SIZE = 64 * 1024
+# With aiohttp, chunks are handed to the parser in the executor in batches of about this size
+STREAM_BATCH_SIZE = 1024 * 1024
+# By default bodies at least this large, or of unknown length, are streamed. Smaller ones
+# are buffered, so an unchanged payload is recognised by its hash without being parsed at all
+STREAM_MIN_BYTES = 256 * 1024
+
+# Member fields tried, in order, for the name books of a household member are tagged with.
+# Card numbers (MemberCode, Barcode) are the login username, so they are never used
+MEMBER_NAME_KEYS = ("Name", "MemberName", "FullName")
+
+def _is_streamable(status: int, headers, min_bytes: int = 0) -> bool:
+    """Check whether a response body should go to the streaming parser."""
+    # Expired sessions are answered with the HTML login page, which must not be parsed
+    if status != 200 or "html" in headers.get("Content-Type", "").lower():
+        return False
+    if not min_bytes:
+        return True
+    # Bodies of unknown length (e.g. chunked) could be any size, so they are streamed
+    try:
+        return int(headers.get("Content-Length", min_bytes)) >= min_bytes
+    except ValueError:
+        return True
+
+class _InvalidPayload(ValueError):
+    """The streamed API body isn't valid JSON."""
+
+class _Response(NamedTuple):
+    """Transport-independent view of an HTTP response."""
+    status: int
+    url: str
+    headers: Dict[str, str]
+    content: bytes
+
+class _StreamingPayloadParser:
+    """
+    Incrementally parse a Libero member payload.
+
+    Only each member's loans, _related barcodes/rsns and name fields are materialised, so large
+    sections such as loanHistory are skipped without ever being built. The result
+    has the same shape as the full document, minus the skipped sections.
+    """
+
+    MEMBER_PREFIX = "members.item"
+    SECTION_PREFIXES = {
+        "members.item.loans.item": ("loans",),
+        "members.item._related.barcodes.item": ("_related", "barcodes"),
+        "members.item._related.rsns.item": ("_related", "rsns"),
+    }
+    # Scalar member fields kept for tagging books with their member
+    MEMBER_FIELDS = {f"members.item.{key}": key for key in MEMBER_NAME_KEYS}
+
+    def __init__(self):
+        self.members: List[Dict[str, Any]] = []
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._events = ijson.sendable_list()
+        self._parser = ijson.parse_coro(self._events, use_float=True)
+        self._builder = None
+        self._builder_prefix = None
+        self._builder_path = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Return the fingerprint of all chunks fed so far."""
+        return self._hash.hexdigest()
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of the response body."""
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        try:
+            self._parser.send(chunk)
+            self._consume_events()
+        except Exception as e:
+            raise _InvalidPayload(str(e)) from e
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the pruned payload."""
+        self._parser.close()
+        self._consume_events()
+        return {"members": self.members}
+
+    def _consume_events(self) -> None:
+        for prefix, event, value in self._events:
+            if self._builder is not None:
+                self._builder.event(event, value)
+                if prefix == self._builder_prefix and event in ("end_map", "end_array"):
+                    self._append(self._builder_path, self._builder.value)
+                    self._builder = None
+            elif prefix == self.MEMBER_PREFIX and event == "start_map":
+                self.members.append({"loans": [], "_related": {"barcodes": [], "rsns": []}})
+            elif prefix in self.MEMBER_FIELDS and event in ("string", "number"):
+                self.members[-1][self.MEMBER_FIELDS[prefix]] = value
+            elif prefix in self.SECTION_PREFIXES:
+                if event in ("start_map", "start_array"):
+                    self._builder = ObjectBuilder()
+                    self._builder.event(event, value)
+                    self._builder_prefix = prefix
+                    self._builder_path = self.SECTION_PREFIXES[prefix]
+                else:
+                    self._append(self.SECTION_PREFIXES[prefix], value)
+        del self._events[:]
+
+    def _append(self, path, value) -> None:
+        target = self.members[-1]
+        for key in path:
+            target = target[key]
+        target.append(value)
 
 class LiberoLibraryScraper(BaseLibraryScraper):
     """
     Libero library system scraper.
-    Uses requests library internally. Note that attempts to use aiohttp instead of requests were not successful.
+
+    Two HTTP transports are supported:
+    - requests (default): blocking calls are run in the executor. This is the
+      fallback path, as earlier attempts to use aiohttp were not successful.
+    - aiohttp: pass an aiohttp.ClientSession as ``session`` to run every request
+      natively on the event loop and keep its connection pool alive across refreshes.
     """
     
     # Libero-specific endpoints
     LOGIN_ENDPOINT = "/libero/WebOpac.cls"
     API_ENDPOINT = "/libero/member/self/api.v1.cls"
     
-    def __init__(self, library_url: str, username: str, password: str, **kwargs):
+    def __init__(
+        self,
+        library_url: str,
+        username: str,
+        password: str,
+        session=None,
+        streaming: Optional[bool] = None,
+        **kwargs,
+    ):
         """
         Initialize the Libero scraper.
         
-        Note: This scraper uses requests library internally and does not accept
-        an external session parameter.
+        Args:
+            session: Optional aiohttp.ClientSession. If omitted (or a requests.Session
+                is given), the requests transport is used instead.
+            streaming: Parse the API response incrementally, skipping loan history.
+                By default (None) bodies of at least STREAM_MIN_BYTES, or of
+                unknown length, are streamed when ijson is installed. Streamed
+                bodies are hashed as they arrive, so an unchanged one skips
+                building books, but it is always tokenised.
         """
         # Normalize the library URL
-        library_url = _normalize_library_url(library_url)
+        library_url = normalize_library_url(library_url)
+
+        # Anything that isn't a requests session is treated as an aiohttp session
+        self.async_transport = session is not None and not isinstance(session, requests.Session)
+        if session is None:
+            session = requests.Session()
+
+        super().__init__(library_url, username, password, session)
+
+        self._stream_min_bytes = STREAM_MIN_BYTES if streaming is None else 0
+        if streaming is None:
+            streaming = ijson is not None
+        elif streaming and ijson is None:
+            _LOGGER.warning("Streaming parse requested but ijson is not installed, using json instead")
+            streaming = False
+        self.streaming = streaming
+
+        # Validators of the last API payload, used to skip re-parsing unchanged data
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._fingerprint: Optional[str] = None
+        self._last_books: Optional[List[LibraryBook]] = None
+        # Due-date format detected in the last payload
+        self._due_date_format: Optional[str] = None
+
+    async def _request(
+        self, method: str, url: str, chunk_handler=None, stream_min_bytes: int = 0, **kwargs
+    ) -> _Response:
+        """
+        Perform an HTTP request using the configured transport.
+
+        If chunk_handler is given, the body of a successful non-HTML response of at
+        least stream_min_bytes (or of unknown length) is passed to it in chunks
+        instead of being buffered, and the returned content is empty.
+        """
+        if self.async_transport:
+            import aiohttp  # Only needed (and guaranteed available) for the async transport
+            timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            async with self.session.request(method, url, timeout=timeout, **kwargs) as response:
+                if chunk_handler and _is_streamable(response.status, response.headers, stream_min_bytes):
+                    loop = asyncio.get_running_loop()
+                    batch: List[bytes] = []
+                    batch_size = 0
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        batch.append(chunk)
+                        batch_size += len(chunk)
+                        if batch_size >= STREAM_BATCH_SIZE:
+                            # Parsing is CPU-bound, so keep it off the event loop, one hop per batch
+                            await loop.run_in_executor(None, chunk_handler, b"".join(batch))
+                            batch, batch_size = [], 0
+                    if batch:
+                        await loop.run_in_executor(None, chunk_handler, b"".join(batch))
+                    content = b""
+                else:
+                    content = await response.read()
+                return _Response(response.status, str(response.url), dict(response.headers), content)
+
+        def do_request():
+            response = self.session.request(
+                method, url, timeout=REQUEST_TIMEOUT, stream=chunk_handler is not None, **kwargs
+            )
+            with response:
+                if chunk_handler and _is_streamable(response.status_code, response.headers, stream_min_bytes):
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        chunk_handler(chunk)
+                    content = b""
+                else:
+                    content = response.content
+                return _Response(response.status_code, response.url, dict(response.headers), content)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, do_request)
 
-        # Initialize base class with our library parameters and a new requests session
-        super().__init__(library_url, username, password, requests.Session())
-    
     async def login(self) -> bool:
         """Login to the Libero library system."""
         try:
-            def do_login():
-                login_url = f"{self.library_url.rstrip('/')}{self.LOGIN_ENDPOINT}"
-                login_params = {
-                    'ACTION': 'MEMLOGIN',
-                    'TONEW': '1',
-                    'usernum': self.username,
-                    'password': self.password,
-                }
-                
-                _LOGGER.debug(f"Attempting login...")
-                response = self.session.post(login_url, params=login_params, allow_redirects=True)
-                _LOGGER.debug(f"Login response status: {response.status_code}")
-                
-                return response.status_code == 200
-            
-            loop = asyncio.get_running_loop()
-            success = await loop.run_in_executor(None, do_login)
-            
-            if success:
-                _LOGGER.info("Login successful")
-            else:
-                _LOGGER.error("Login failed")
-            
-            return success
+            await self._login_or_raise()
+            return True
             
         except Exception as e:
-            _LOGGER.error(f"Login failed with exception: {e}")
+            _LOGGER.error(f"Login failed: {e}")
             return False
 
     async def get_outstanding_books(self, force_login: bool = True) -> List[LibraryBook]:
-        """Get outstanding books from Libero API."""
+        """
+        Get outstanding books from Libero API.
+
+        Without force_login the existing session is reused, and a login is only
+        performed when there is no session yet or the library reports it expired.
+        """
         try:
-            if force_login:
-                _LOGGER.debug("Force login requested, logging in...")
-                login_success = await self.login()
-                if not login_success:
-                    _LOGGER.error("Login failed, can't get books")
-                    raise Exception("Authentication failed")
-            
-            def get_books():
-                api_url = f"{self.library_url.rstrip('/')}{self.API_ENDPOINT}"
-                _LOGGER.debug(f"Requesting API data from: {api_url}")
+            if force_login or not self.has_session():
+                _LOGGER.debug("No reusable session (or force login requested), logging in...")
+                await self._login_or_raise()
+            
+            api_url = f"{self.library_url.rstrip('/')}{self.API_ENDPOINT}"
+            _LOGGER.debug(f"Requesting API data from: {api_url}")
+            
+            response, parser = await self._fetch_api(api_url)
+            
+            if self._is_session_expired(response):
+                _LOGGER.debug("Session expired, logging in again...")
+                await self._login_or_raise()
+                response, parser = await self._fetch_api(api_url)
+            
+            self.last_fetch_unchanged = False
+            
+            if response.status == 304 and self._last_books is not None:
+                _LOGGER.debug("API data not modified since last fetch")
+                self.last_fetch_unchanged = True
+                return self._last_books
+            
+            if response.status != 200:
+                _LOGGER.error(f"Failed to get API data: HTTP {response.status}")
+                raise FetchError.from_status(
+                    STAGE_FETCH, response.status, response.headers, f"API request failed with status {response.status}"
+                )
+            
+            try:
+                if parser is not None and parser.size:
+                    # The payload was parsed while streaming; an unchanged fingerprint still
+                    # skips building books and notifying the coordinator
+                    json_data = parser.close()
+                    fingerprint = parser.fingerprint
+                else:
+                    json_data = None
+                    fingerprint = hashlib.sha256(response.content).hexdigest()
                 
-                response = self.session.get(api_url)
+                if fingerprint == self._fingerprint and self._last_books is not None:
+                    _LOGGER.debug("API data unchanged since last fetch, skipping parse")
+                    self.last_fetch_unchanged = True
+                    return self._last_books
                 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    _LOGGER.error(f"Failed to get API data: HTTP {response.status_code}")
-                    raise Exception(f"API request failed with status {response.status_code}")
-            
-            loop = asyncio.get_running_loop()
-            json_data = await loop.run_in_executor(None, get_books)
+                with self.metrics.time(METRIC_PARSE):
+                    if json_data is None:
+                        json_data = json.loads(response.content)
+                    books = self._parse_libero_api_data(json_data) if json_data else []
+            except Exception as e:
+                # The same payload would fail again, so this isn't retried
+                raise FetchError(f"Invalid API data: {e}", STAGE_PARSE, retryable=False) from e
             
-            if json_data:
-                return self._parse_libero_api_data(json_data)
-            else:
-                return []
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            self._etag = headers.get("etag")
+            self._last_modified = headers.get("last-modified")
+            self._fingerprint = fingerprint
+            self._last_books = books
+            return books
                 
         except Exception as e:
             _LOGGER.error(f"Failed to get outstanding books: {e}")
             raise  # Re-raise to let coordinator handle it
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        """Build conditional request headers from the last successful fetch."""
+        headers = {}
+        if self._last_books is None:
+            return headers
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    async def _fetch_api(self, api_url: str) -> Tuple[_Response, Optional[_StreamingPayloadParser]]:
+        """Request the member API, with a streaming parser attached if enabled (used for large or chunked bodies)."""
+        parser = _StreamingPayloadParser() if self.streaming else None
+        try:
+            # With streaming enabled this includes parsing, which happens as the body arrives
+            with self.metrics.time(METRIC_FETCH):
+                response = await self._request(
+                    "GET",
+                    api_url,
+                    chunk_handler=parser and parser.feed,
+                    stream_min_bytes=self._stream_min_bytes,
+                    headers=self._conditional_headers(),
+                )
+        except _InvalidPayload as e:
+            # The same payload would fail again, so this isn't retried
+            raise FetchError(f"Invalid API data: {e}", STAGE_PARSE, retryable=False) from e
+        except Exception as e:
+            raise FetchError(f"API request failed: {e}", STAGE_FETCH) from e
+        if response.status == 200:
+            self.metrics.record(METRIC_PAYLOAD_BYTES, len(response.content) or (parser.size if parser else 0))
+        return response, parser
+
+    async def _login_or_raise(self) -> None:
+        """Login, raising a FetchError if it fails."""
+        login_url = f"{self.library_url.rstrip('/')}{self.LOGIN_ENDPOINT}"
+        login_params = {
+            'ACTION': 'MEMLOGIN',
+            'TONEW': '1',
+            'usernum': self.username,
+            'password': self.password,
+        }
+        
+        _LOGGER.debug(f"Attempting login...")
+        try:
+            with self.metrics.time(METRIC_LOGIN):
+                response = await self._request("POST", login_url, params=login_params, allow_redirects=True)
+        except Exception as e:
+            raise FetchError(f"Login request failed: {e}", STAGE_LOGIN) from e
+        _LOGGER.debug(f"Login response status: {response.status}")
+        
+        if response.status != 200:
+            raise FetchError.from_status(
+                STAGE_LOGIN, response.status, response.headers, f"Authentication failed with status {response.status}"
+            )
+        _LOGGER.info("Login successful")
+
+    def _is_session_expired(self, response: _Response) -> bool:
+        """Check whether an API response indicates the session is no longer valid."""
+        if response.status in (401, 403):
+            return True
+        # An expired session is redirected to the OPAC login page rather than the JSON API
+        if self.LOGIN_ENDPOINT in response.url:
+            return True
+        content_type = next(
+            (value for key, value in response.headers.items() if key.lower() == "content-type"), ""
+        )
+        if response.status != 200 or "html" not in content_type.lower():
+            return False
+        # Some servers label the JSON API text/html; only an HTML page means the login form
+        return response.content.lstrip()[:1] not in (b"{", b"[")
+
+    def has_session(self) -> bool:
+        """Return True if the HTTP session holds any cookies that could be reused."""
+        return bool(self.export_cookies())
+
+    def export_cookies(self) -> List[Dict[str, Any]]:
+        """Export the session cookies so they can be persisted."""
+        if not self.session:
+            return []
+
+        if self.async_transport:
+            return [
+                {
+                    "name": morsel.key,
+                    "value": morsel.value,
+                    "domain": morsel["domain"],
+                    "path": morsel["path"] or "/",
+                    "secure": bool(morsel["secure"]),
+                }
+                for morsel in self.session.cookie_jar
+            ]
+
+        return [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path or "/",
+                "secure": bool(cookie.secure),
+                "expires": cookie.expires,
+            }
+            for cookie in self.session.cookies
+        ]
+
+    def import_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """Restore session cookies previously returned by export_cookies."""
+        if not self.session or not cookies:
+            return
+
+        if self.async_transport:
+            from http.cookies import SimpleCookie
+            from yarl import URL
+
+            jar = SimpleCookie()
+            for cookie in cookies:
+                jar[cookie["name"]] = cookie["value"]
+                morsel = jar[cookie["name"]]
+                if cookie.get("domain"):
+                    morsel["domain"] = cookie["domain"]
+                morsel["path"] = cookie.get("path", "/")
+                if cookie.get("secure"):
+                    morsel["secure"] = True
+            self.session.cookie_jar.update_cookies(jar, URL(self.library_url))
+            return
+
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False),
+                expires=cookie.get("expires"),
+            )
+
+    def forget_last_fetch(self) -> None:
+        """Drop the validators and books of the last fetch."""
+        self._etag = None
+        self._last_modified = None
+        self._fingerprint = None
+        self._last_books = None
+
+    async def logout(self) -> None:
+        """Logout from the library system."""
+        if self.async_transport:
+            if self.session:
+                await self.session.close()
+                self.session = None
+            return
+        await super().logout()
     
     def _parse_libero_api_data(self, json_data) -> List[LibraryBook]:
         """Parse books from Libero API JSON response."""
@@ -122,112 +491,26 @@ class LiberoLibraryScraper(BaseLibraryScraper):
                 _LOGGER.error("No members found in JSON data")
                 return books
             
-            member = members[0]  # Get first member
-            _LOGGER.debug(f"Processing member data with keys: {list(member.keys())}")
+            # Household cards return one member per person; the _related tables are
+            # merged once so every member's loans share the same lookups
+            related_barcodes_by_barcode = {}
+            related_rsns_by_rsn = {}
+            for member in members:
+                related = member.get('_related', {})
+                related_barcodes_by_barcode.update((item.get('Barcode'), item) for item in related.get('barcodes', []))
+                related_rsns_by_rsn.update((item.get('RSN'), item) for item in related.get('rsns', []))
             
-            # Get loans, loan history, and related barcodes
-            loans = member.get('loans', [])
-            loan_history = member.get('loanHistory', [])
-            related_barcodes = member.get('_related', {}).get('barcodes', [])
-            related_rsns = member.get('_related', {}).get('rsns', [])
+            _LOGGER.debug(f"Found {len(members)} members, {len(related_barcodes_by_barcode)} related barcodes")
             
-            _LOGGER.debug(f"Found {len(loans)} loans, {len(loan_history)} history items, {len(related_barcodes)} related barcodes")
+            # The due-date format rarely changes, so the one detected last time is tried first
+            date_parser = DueDateParser(self._due_date_format)
+            for index, member in enumerate(members):
+                member_name = self._member_name(member, index, len(members))
+                books.extend(self._parse_member_loans(
+                    member, member_name, related_barcodes_by_barcode, related_rsns_by_rsn, date_parser
+                ))
+            self._due_date_format = date_parser.format
             
-            # Create lookup dictionaries for efficiency
-            loan_history_by_barcode = {item.get('Barcode'): item for item in loan_history}
-            related_barcodes_by_barcode = {item.get('Barcode'): item for item in related_barcodes}
-            related_rsns_by_rsn = {item.get('RSN'): item for item in related_rsns}
-
-            # Process each loan
-            for loan in loans:
-                try:
-                    # Get Barcode
-                    barcode = loan.get('Barcode')
-                    if not barcode:
-                        _LOGGER.warning("Loan missing Barcode, skipping")
-                        continue
-
-                    # Get Renewal Count
-                    renewal_count = loan.get('RenewalCount', 0)
-                    
-                    # Get DueDate
-                    due_date_str = loan.get('DueDate')
-                    if not due_date_str:
-                        _LOGGER.warning(f"Loan {barcode} missing DueDate, skipping")
-                        continue
-                    
-                    _LOGGER.debug(f"Processing loan - Barcode: {barcode}, DueDate: {due_date_str}")
-                    
-                    # Find barcode in loan history
-                    #history_item = loan_history_by_barcode.get(barcode)
-                    #if not history_item:
-                    #    _LOGGER.warning(f"Barcode {barcode} not found in loan history, skipping")
-                    #    continue
-                    
-                    # Find related barcode entry by barcode
-                    related_barcode_item = related_barcodes_by_barcode.get(barcode)
-                    if not related_barcode_item:
-                        _LOGGER.warning(f"Barcode {barcode} not found in related barcodes, skipping")
-                        continue
-                    
-                    # Get RSN
-                    rsn = related_barcode_item.get('RSN')
-                    if not rsn:
-                        _LOGGER.warning(f"RSN not found for barcode {barcode}, skipping")
-                        continue
-                    
-                    # Find related RSN entry to get other metadata
-                    rsn_item = related_rsns_by_rsn.get(rsn)
-                    if not rsn_item:
-                        _LOGGER.warning(f"RSN {rsn} not found in related barcodes by ID, skipping")
-                        continue
-                    
-                    # Get ISBN, Title, Author
-                    isbn = rsn_item.get('ISBN', '').strip()
-                    title = rsn_item.get('Title', 'Unknown Title')
-                    author = rsn_item.get('AuthorKey', rsn_item.get('MainAuthor', 'Unknown'))
-
-                    # Get image URL
-                    if isbn != '':
-                        image_url = f"{self.library_url}/libero/Cover.cls?type=cover&size=80&isbn={isbn}"
-
-                    # Log the data
-                    _LOGGER.info(f"Found book - Barcode: {barcode}, DueDate: {due_date_str}, ISBN: {isbn}, Title: {title}")
-
-                    # Parse due date
-                    try:
-                        # Try different date formats
-                        if 'T' in due_date_str:
-                            # ISO format with time
-                            due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00')).date()
-                        else:
-                            # Try common date formats
-                            try:
-                                due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-                            except ValueError:
-                                due_date = datetime.strptime(due_date_str, "%d/%m/%Y").date()
-                    except ValueError as e:
-                        _LOGGER.warning(f"Could not parse due date '{due_date_str}': {e}")
-                        continue
-                    
-                    # Create a temporary book object
-                    # TODO: add other fields
-                    book = LibraryBook(
-                        title=title,
-                        author=author,
-                        due_date=due_date,
-                        isbn=isbn,
-                        barcode=barcode,
-                        image_url=image_url,
-                        renewal_count=renewal_count,
-                        renewable=True  # TODO: Implement renewal logic
-                    )
-                    books.append(book)
-                    
-                except Exception as e:
-                    _LOGGER.error(f"Failed to process loan {barcode}: {e}")
-                    continue
-        
             _LOGGER.info(f"Successfully parsed {len(books)} books from Libero API")
             
         except Exception as e:
@@ -235,7 +518,112 @@ class LiberoLibraryScraper(BaseLibraryScraper):
         
         return books
     
+    @staticmethod
+    def _member_name(member: Dict[str, Any], index: int, count: int) -> Optional[str]:
+        """Return the name books of a member are tagged with."""
+        for key in MEMBER_NAME_KEYS:
+            value = member.get(key)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+        # Only number anonymous members when there is more than one to tell apart
+        return f"Member {index + 1}" if count > 1 else None
+    
+    def _parse_member_loans(
+        self,
+        member: Dict[str, Any],
+        member_name: Optional[str],
+        related_barcodes_by_barcode: Dict[str, Dict[str, Any]],
+        related_rsns_by_rsn: Dict[str, Dict[str, Any]],
+        date_parser: DueDateParser,
+    ) -> List[LibraryBook]:
+        """Build the books on loan to one member."""
+        books = []
+        loans = member.get('loans', [])
+        _LOGGER.debug(f"Processing {len(loans)} loans for member {member_name or 1}")
+        
+        # Process each loan
+        for loan in loans:
+            try:
+                # Get Barcode
+                barcode = loan.get('Barcode')
+                if not barcode:
+                    _LOGGER.warning("Loan missing Barcode, skipping")
+                    continue
+
+                # Get Renewal Count
+                renewal_count = loan.get('RenewalCount', 0)
+                
+                # Get DueDate
+                due_date_str = loan.get('DueDate')
+                if not due_date_str:
+                    _LOGGER.warning(f"Loan {barcode} missing DueDate, skipping")
+                    continue
+                
+                _LOGGER.debug(f"Processing loan - Barcode: {barcode}, DueDate: {due_date_str}")
+                
+                # Find related barcode entry by barcode
+                related_barcode_item = related_barcodes_by_barcode.get(barcode)
+                if not related_barcode_item:
+                    _LOGGER.warning(f"Barcode {barcode} not found in related barcodes, skipping")
+                    continue
+                
+                # Get RSN
+                rsn = related_barcode_item.get('RSN')
+                if not rsn:
+                    _LOGGER.warning(f"RSN not found for barcode {barcode}, skipping")
+                    continue
+                
+                # Find related RSN entry to get other metadata
+                rsn_item = related_rsns_by_rsn.get(rsn)
+                if not rsn_item:
+                    _LOGGER.warning(f"RSN {rsn} not found in related barcodes by ID, skipping")
+                    continue
+                
+                # Get ISBN, Title, Author
+                isbn = rsn_item.get('ISBN', '').strip()
+                title = rsn_item.get('Title', 'Unknown Title')
+                author = rsn_item.get('AuthorKey', rsn_item.get('MainAuthor', 'Unknown'))
+
+                # Get image URL
+                image_url = ""
+                if isbn != '':
+                    image_url = f"{self.library_url}/libero/Cover.cls?type=cover&size=80&isbn={isbn}"
+
+                # Log the data
+                _LOGGER.info(f"Found book - Barcode: {barcode}, DueDate: {due_date_str}, ISBN: {isbn}, Title: {title}")
+
+                # Parse due date
+                try:
+                    due_date = date_parser.parse(due_date_str)
+                except ValueError as e:
+                    _LOGGER.warning(f"Could not parse due date '{due_date_str}': {e}")
+                    continue
+                
+                # Create a temporary book object
+                # TODO: add other fields
+                book = LibraryBook(
+                    title=title,
+                    author=author,
+                    due_date=due_date,
+                    isbn=isbn,
+                    barcode=barcode,
+                    image_url=image_url,
+                    renewal_count=renewal_count,
+                    # Not offered until renew_book is implemented for Libero
+                    # False until renew_book is implemented for Libero
+                    renewable=self.renewal_supported,
+                    member=member_name,
+                )
+                books.append(book)
+                
+            except Exception as e:
+                _LOGGER.error(f"Failed to process loan {barcode}: {e}")
+                continue
+
+        return books
+    
     async def renew_book(self, book: LibraryBook) -> bool:
         """Attempt to renew a book in Libero system."""
-        # TODO: Implement renewal logic using requests
+        # TODO: Implement renewal logic once the Libero renewal endpoint is known;
+        # set renewal_supported = True then so renew_books uses it
         return False
@@ -1,19 +1,29 @@
 """Sensor platform for library books integration."""
+from datetime import timedelta
 import logging
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Callable, Dict, List, Optional, cast
 
 from homeassistant.components.sensor import (
     SensorEntity, 
     SensorDeviceClass,
     SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .aggregate import LibraryBooksAggregate
+from .const import DOMAIN, CONF_ALL_LIBRARIES, ALL_LIBRARIES_NAME, DUE_SOON_DAYS
 from .coordinator import LibraryBooksCoordinator
+from .metrics import (
+    COUNTER_CIRCUIT_OPEN, COUNTER_FAILURES, COUNTER_REFRESHES, COUNTER_RETRIES, COUNTER_UNCHANGED,
+    METRIC_FETCH, METRIC_LOGIN, METRIC_PARSE, METRIC_PAYLOAD_BYTES, METRIC_REFRESH,
+    RefreshMetrics,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,6 +31,15 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the library books sensors."""
+    if entry.data.get(CONF_ALL_LIBRARIES):
+        aggregate = hass.data[DOMAIN][entry.entry_id]
+        async_add_entities([
+            AllLibrariesTotalSensor(aggregate),
+            AllLibrariesOverdueSensor(aggregate),
+            AllLibrariesDueSoonSensor(aggregate),
+        ])
+        return
+    
     coordinator = hass.data[DOMAIN][entry.entry_id]
     library_name = entry.data.get("name", "Library")
     
@@ -28,12 +47,24 @@ async def async_setup_entry(
         LibraryBooksTotalSensor(coordinator, library_name),
         LibraryBooksOverdueSensor(coordinator, library_name),
     ]
+    entities.extend(
+        LibraryBooksMetricSensor(coordinator, library_name, description) for description in METRIC_SENSORS
+    )
     
     async_add_entities(entities)
 
+def _with_stale(coordinator: LibraryBooksCoordinator, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Flag attributes built from cached data that hasn't been refreshed yet."""
+    if coordinator.stale:
+        return {**attributes, "stale": True}
+    return attributes
+
 class LibraryBooksTotalSensor(CoordinatorEntity, SensorEntity):
     """Sensor tracking total number of library books."""
 
+    # The book list is rewritten on every change; keep it out of the history database
+    _unrecorded_attributes = frozenset({"books"})
+
     def __init__(self, coordinator: LibraryBooksCoordinator, library_name: str):
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -55,33 +86,18 @@ class LibraryBooksTotalSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the native value of the sensor."""
-        if not self.coordinator.data:
-            return 0
-            
-        return len(self.coordinator.data)
+        return self.coordinator.snapshot.total
         
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional attributes about the books."""
-        if not self.coordinator.data:
-            return {}
-            
-        return {
-            "books": [
-                {
-                    "title": book.title,
-                    "author": book.author,
-                    "due_date": book.due_date.isoformat(),
-                    "is_overdue": book.is_overdue,
-                    "days_until_due": book.days_until_due,
-                }
-                for book in self.coordinator.data
-            ]
-        }
+        return _with_stale(self.coordinator, self.coordinator.snapshot.total_attributes)
 
 class LibraryBooksOverdueSensor(CoordinatorEntity, SensorEntity):
     """Sensor tracking number of overdue books."""
 
+    _unrecorded_attributes = frozenset({"overdue_books"})
+
     def __init__(self, coordinator: LibraryBooksCoordinator, library_name: str):
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -103,25 +119,211 @@ class LibraryBooksOverdueSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> int:
         """Return the number of overdue books."""
-        if not self.coordinator.data:
-            return 0
-        
-        return sum(1 for book in self.coordinator.data if book.is_overdue)
+        return self.coordinator.snapshot.overdue
         
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return additional attributes about overdue books."""
-        if not self.coordinator.data:
-            return {}
-            
-        return {
+        return _with_stale(self.coordinator, self.coordinator.snapshot.overdue_attributes)
+
+def _percentiles(metrics: RefreshMetrics, *names: str) -> Dict[str, Any]:
+    """Return the p50 and p95 of each histogram."""
+    attributes = {}
+    for name in names:
+        histogram = metrics.histograms.get(name)
+        if histogram is None:
+            continue
+        summary = histogram.summary()
+        attributes[f"{name}_p50"] = summary.get("p50")
+        attributes[f"{name}_p95"] = summary.get("p95")
+    return attributes
+
+def _last(metrics: RefreshMetrics, name: str) -> Optional[float]:
+    value = metrics.last(name)
+    return round(value, 3) if value is not None else None
+
+# Diagnostic sensors built from the refresh metrics
+METRIC_SENSORS = (
+    SensorEntityDescription(
+        key="refresh_duration",
+        name="Refresh Duration",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+    ),
+    SensorEntityDescription(
+        key="payload_size",
+        name="Payload Size",
+        icon="mdi:download",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+    ),
+    SensorEntityDescription(
+        key="refresh_failures",
+        name="Refresh Failures",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+_METRIC_VALUES: Dict[str, Callable[[RefreshMetrics], Any]] = {
+    "refresh_duration": lambda metrics: _last(metrics, METRIC_REFRESH),
+    "payload_size": lambda metrics: metrics.last(METRIC_PAYLOAD_BYTES),
+    "refresh_failures": lambda metrics: metrics.counters.get(COUNTER_FAILURES, 0),
+}
+
+_METRIC_ATTRIBUTES: Dict[str, Callable[[RefreshMetrics], Dict[str, Any]]] = {
+    "refresh_duration": lambda metrics: _percentiles(
+        metrics, METRIC_REFRESH, METRIC_LOGIN, METRIC_FETCH, METRIC_PARSE
+    ),
+    "payload_size": lambda metrics: _percentiles(metrics, METRIC_PAYLOAD_BYTES),
+    "refresh_failures": lambda metrics: {
+        name: metrics.counters.get(name, 0)
+        for name in (COUNTER_REFRESHES, COUNTER_UNCHANGED, COUNTER_RETRIES, COUNTER_CIRCUIT_OPEN)
+    },
+}
+
+class LibraryBooksMetricSensor(SensorEntity):
+    """
+    Diagnostic sensor reporting refresh timings, payload sizes or failures.
+
+    Disabled by default. It updates after every refresh attempt, including the
+    unchanged and failed ones that don't notify the book sensors.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+
+    def __init__(
+        self, coordinator: LibraryBooksCoordinator, library_name: str, description: SensorEntityDescription
+    ):
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.library_name = library_name
+        self.entity_description = description
+        
+        self._attr_unique_id = f"{DOMAIN}_{library_name.lower().replace(' ', '_')}_{description.key}"
+        self._attr_name = f"{library_name} {description.name}"
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever a refresh finishes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_metrics_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self):
+        """Return the latest value of the metric."""
+        return _METRIC_VALUES[self.entity_description.key](self.coordinator.metrics)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return percentiles or related counters."""
+        return _METRIC_ATTRIBUTES[self.entity_description.key](self.coordinator.metrics)
+
+class AllLibrariesSensor(SensorEntity):
+    """Base for the sensors summarising every library account; updates when any account does."""
+
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = "books"
+
+    def __init__(self, aggregate: LibraryBooksAggregate, key: str, name: str, icon: str):
+        """Initialize the sensor."""
+        self.aggregate = aggregate
+        self._attr_unique_id = f"{DOMAIN}_all_libraries_{key}"
+        self._attr_name = f"{ALL_LIBRARIES_NAME} {name}"
+        self._attr_icon = icon
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever any library account updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.aggregate.async_add_listener(self.async_write_ha_state))
+
+    def _with_stale(self, attributes: Dict[str, Any]) -> Dict[str, Any]:
+        """Flag attributes that include cached data that hasn't been refreshed yet."""
+        if self.aggregate.stale:
+            return {**attributes, "stale": True}
+        return attributes
+
+class AllLibrariesTotalSensor(AllLibrariesSensor):
+    """Sensor tracking the books on loan from every library."""
+
+    def __init__(self, aggregate: LibraryBooksAggregate):
+        """Initialize the sensor."""
+        super().__init__(aggregate, "total_books", "Total Books", "mdi:book-multiple")
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of books on loan."""
+        return sum(coordinator.snapshot.total for coordinator in self.aggregate.coordinators.values())
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the number of books per library."""
+        return self._with_stale({
+            "libraries": {
+                self.aggregate.library_names[entry_id]: coordinator.snapshot.total
+                for entry_id, coordinator in self.aggregate.coordinators.items()
+            }
+        })
+
+class AllLibrariesOverdueSensor(AllLibrariesSensor):
+    """Sensor tracking the overdue books of every library."""
+
+    _unrecorded_attributes = frozenset({"overdue_books"})
+
+    def __init__(self, aggregate: LibraryBooksAggregate):
+        """Initialize the sensor."""
+        super().__init__(aggregate, "overdue_books", "Overdue Books", "mdi:book-alert")
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of overdue books."""
+        return sum(coordinator.snapshot.overdue for coordinator in self.aggregate.coordinators.values())
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the overdue books, tagged with their library."""
+        return self._with_stale({
             "overdue_books": [
-                {
-                    "title": book.title,
-                    "author": book.author,
-                    "due_date": book.due_date.isoformat(),
-                    "days_overdue": abs(book.days_until_due),
-                }
-                for book in self.coordinator.data if book.is_overdue
+                {**book, "library": self.aggregate.library_names[entry_id]}
+                for entry_id, coordinator in self.aggregate.coordinators.items()
+                for book in coordinator.snapshot.overdue_attributes.get("overdue_books", [])
             ]
-        }
\ No newline at end of file
+        })
+
+class AllLibrariesDueSoonSensor(AllLibrariesSensor):
+    """Sensor tracking the books of every library due within the next week."""
+
+    _unrecorded_attributes = frozenset({"books"})
+
+    def __init__(self, aggregate: LibraryBooksAggregate):
+        """Initialize the sensor."""
+        super().__init__(aggregate, "due_this_week", "Due This Week", "mdi:book-clock")
+
+    def _due_soon(self):
+        today = dt_util.now().date()
+        return self.aggregate.index.between(today, today + timedelta(days=DUE_SOON_DAYS))
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of books due within the week."""
+        return len(self._due_soon())
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the books due within the week, in due date order."""
+        books = []
+        for entry_id, book in self._due_soon():
+            attributes = {
+                "title": book.title,
+                "author": book.author,
+                "due_date": book.due_date.isoformat(),
+                "library": self.aggregate.library_names[entry_id],
+            }
+            if book.member:
+                attributes["member"] = book.member
+            books.append(attributes)
+        return self._with_stale({"books": books})
@@ -0,0 +1,155 @@
+"""Services for the Library Books integration."""
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .coordinator import LibraryBooksCoordinator
+from .profiling import PROFILE_TOP, async_profile, write_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_GET_BOOKS = "get_books"
+SERVICE_RENEW_BOOKS = "renew_books"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_BARCODES = "barcodes"
+ATTR_TOP = "top"
+
+GET_BOOKS_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+})
+
+RENEW_BOOKS_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_BARCODES): vol.All(cv.ensure_list, [cv.string]),
+})
+
+PROFILE_REFRESH_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_TOP, default=PROFILE_TOP): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+})
+
+def _get_coordinator(hass: HomeAssistant, entry_id: str) -> LibraryBooksCoordinator:
+    """Return the coordinator of a loaded config entry."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+    if not isinstance(coordinator, LibraryBooksCoordinator):
+        raise HomeAssistantError(f"Library Books entry {entry_id} is not loaded")
+    return coordinator
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_get_books(call: ServiceCall) -> ServiceResponse:
+        """Return the books of one entry, or of every loaded entry."""
+        if ATTR_CONFIG_ENTRY_ID in call.data:
+            coordinators = [_get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])]
+        else:
+            coordinators = [
+                value for value in hass.data.get(DOMAIN, {}).values() if isinstance(value, LibraryBooksCoordinator)
+            ]
+
+        books = []
+        for coordinator in coordinators:
+            snapshot = coordinator.snapshot
+            books.extend(
+                {**book, "library": coordinator.library_name, "entry_id": coordinator.entry_id}
+                for book in snapshot.total_attributes.get("books", [])
+            )
+        return {"books": books}
+
+    # The sensors' book lists aren't recorded, so this is how automations and scripts get them
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_BOOKS,
+        async_get_books,
+        schema=GET_BOOKS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile_refresh(call: ServiceCall) -> None:
+        """Profile one full refresh of an entry and write the results to the config directory."""
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        coordinator = _get_coordinator(hass, entry_id)
+
+        _LOGGER.info(f"Profiling a refresh of {coordinator.library_name}")
+        report, profiler = await async_profile(coordinator.async_full_refresh, call.data[ATTR_TOP])
+
+        name = f"{DOMAIN}_profile_{slugify(coordinator.library_name)}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}"
+        report_path, stats_path = await hass.async_add_executor_job(
+            write_profile, hass.config.config_dir, name, report, profiler
+        )
+        _LOGGER.info(f"Wrote refresh profile to {report_path} and {stats_path}")
+        persistent_notification.async_create(
+            hass,
+            f"Profile of a {coordinator.library_name} refresh written to `{report_path}` "
+            f"(raw stats for snakeviz or pstats: `{stats_path}`).",
+            title="Library Books profile",
+            notification_id=f"{DOMAIN}_profile_{entry_id}",
+        )
+
+    # Profiling slows Home Assistant down while it runs, so only admins may start it
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+    )
+
+@callback
+def async_update_renew_service(hass: HomeAssistant) -> None:
+    """
+    Offer the renew_books service only while a loaded entry's library system supports renewal.
+
+    Called whenever an entry is set up or unloaded.
+    """
+    supported = any(
+        value.scraper.renewal_supported
+        for value in hass.data.get(DOMAIN, {}).values()
+        if isinstance(value, LibraryBooksCoordinator)
+    )
+    registered = hass.services.has_service(DOMAIN, SERVICE_RENEW_BOOKS)
+    if registered and not supported:
+        hass.services.async_remove(DOMAIN, SERVICE_RENEW_BOOKS)
+    if registered or not supported:
+        return
+
+    async def async_renew_books(call: ServiceCall) -> ServiceResponse:
+        """Renew loans of an entry and return the outcome for each book."""
+        coordinator = _get_coordinator(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        if not coordinator.scraper.renewal_supported:
+            raise HomeAssistantError(f"Renewal isn't supported for {coordinator.library_name}")
+        try:
+            results = await coordinator.async_renew_books(call.data.get(ATTR_BARCODES))
+        except Exception as ex:
+            raise HomeAssistantError(f"Renewing books failed: {ex}") from ex
+
+        return {
+            "results": [
+                {
+                    "barcode": result.barcode,
+                    "title": result.title,
+                    "renewed": result.renewed,
+                    "message": result.message,
+                    "due_date": result.due_date.isoformat() if result.due_date else None,
+                }
+                for result in results
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RENEW_BOOKS,
+        async_renew_books,
+        schema=RENEW_BOOKS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,105 @@
+"""Per-host HTTP connection pools shared between library accounts."""
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+from .const import TRANSPORT_AIOHTTP
+from .library_scraper import host_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of open connections to a single library host
+POOL_LIMIT_PER_HOST = 10
+
+class SessionPool:
+    """
+    Hand out per-account HTTP sessions that share keep-alive connections per host.
+
+    Every account gets its own session (and therefore its own cookie jar), but all
+    sessions for the same library host reuse one connection pool, so TLS handshakes
+    and open sockets don't grow with the number of accounts.
+
+    Each transport's library is imported only when a session for it is acquired, so
+    aiohttp-only setups never load requests on the event loop.
+    """
+
+    def __init__(self, aiohttp_session_factory: Optional[Callable[..., Any]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            aiohttp_session_factory: Creates an aiohttp.ClientSession from keyword
+                arguments. Home Assistant passes async_create_clientsession, whose
+                sessions bring its SSL context and user agent and share its
+                keep-alive connector; without one, a connector per host is created here.
+        """
+        self._aiohttp_session_factory = aiohttp_session_factory
+        # (host, transport) -> [shared pool, number of sessions using it]
+        self._pools: Dict[Tuple[str, str], list] = {}
+
+    def acquire(self, library_url: str, transport: str):
+        """
+        Create a session for one account.
+
+        Returns an aiohttp.ClientSession for the aiohttp transport, or a
+        requests.Session for the requests transport.
+        """
+        if transport == TRANSPORT_AIOHTTP and self._aiohttp_session_factory is not None:
+            import aiohttp
+
+            # The factory's connector already pools connections per host
+            return self._aiohttp_session_factory(cookie_jar=aiohttp.CookieJar(unsafe=True, quote_cookie=False))
+
+        key = (host_key(library_url), transport)
+        entry = self._pools.get(key)
+        if entry is None:
+            entry = self._pools[key] = [self._create_pool(transport), 0]
+            _LOGGER.debug(f"Created {transport} connection pool for {key[0]}")
+        entry[1] += 1
+
+        if transport == TRANSPORT_AIOHTTP:
+            import aiohttp
+
+            return aiohttp.ClientSession(
+                connector=entry[0],
+                connector_owner=False,
+                cookie_jar=aiohttp.CookieJar(unsafe=True, quote_cookie=False),
+            )
+        from .requests_pool import PooledRequestsSession
+
+        return PooledRequestsSession(key[0], entry[0])
+
+    async def async_release(self, library_url: str, transport: str) -> None:
+        """Release a session from acquire, closing the host pool once it is unused."""
+        key = (host_key(library_url), transport)
+        entry = self._pools.get(key)
+        if entry is None:
+            # Sessions from the aiohttp factory don't hold a pool of ours
+            return
+
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._pools[key]
+            await self._close_pool(entry[0], transport)
+            _LOGGER.debug(f"Closed {transport} connection pool for {key[0]}")
+
+    async def async_close(self) -> None:
+        """Close every pool."""
+        pools, self._pools = self._pools, {}
+        for (_, transport), (pool, _) in pools.items():
+            await self._close_pool(pool, transport)
+
+    def _create_pool(self, transport: str):
+        if transport == TRANSPORT_AIOHTTP:
+            import aiohttp
+
+            return aiohttp.TCPConnector(limit_per_host=POOL_LIMIT_PER_HOST)
+        from .requests_pool import create_adapter
+
+        return create_adapter(POOL_LIMIT_PER_HOST)
+
+    @staticmethod
+    async def _close_pool(pool, transport: str) -> None:
+        if transport == TRANSPORT_AIOHTTP:
+            await pool.close()
+        else:
+            pool.close()
@@ -0,0 +1,72 @@
+"""Per-update snapshot of the values shared by the library book entities."""
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from .const import COVER_URL
+from .cover_cache import cover_key
+from .models import LibraryBook
+
+def unsigned_cover_url(isbn: str) -> str:
+    """Return the local URL of a cached cover, without an access signature."""
+    return COVER_URL.format(isbn=isbn)
+
+class BooksSnapshot:
+    """
+    Counts and attribute payloads for one set of books on one day.
+
+    Built once per coordinator update (and again when the date rolls over), so every
+    entity reads the same precomputed values and today's date is looked up once.
+    """
+
+    def __init__(
+        self,
+        books: Optional[List[LibraryBook]],
+        today: date,
+        cover_url: Callable[[str], str] = unsigned_cover_url,
+    ):
+        """Build the snapshot, with cover_url turning an ISBN into the URL its cover is served from."""
+        self.today = today
+        self.total = 0
+        self.overdue = 0
+        self.total_attributes: Dict[str, Any] = {}
+        self.overdue_attributes: Dict[str, Any] = {}
+
+        if not books:
+            return
+
+        book_list = []
+        overdue_list = []
+        for book in books:
+            days_until_due = (book.due_date - today).days
+            is_overdue = days_until_due < 0
+            due_date = book.due_date.isoformat()
+
+            attributes = {
+                "title": book.title,
+                "author": book.author,
+                "due_date": due_date,
+                "is_overdue": is_overdue,
+                "days_until_due": days_until_due,
+            }
+            if book.member:
+                attributes["member"] = book.member
+            # Covers are served from the local cache rather than the library
+            isbn = cover_key(book.isbn) if book.image_url else None
+            if isbn:
+                attributes["cover_url"] = cover_url(isbn)
+            book_list.append(attributes)
+            if is_overdue:
+                overdue = {
+                    "title": book.title,
+                    "author": book.author,
+                    "due_date": due_date,
+                    "days_overdue": -days_until_due,
+                }
+                if book.member:
+                    overdue["member"] = book.member
+                overdue_list.append(overdue)
+
+        self.total = len(book_list)
+        self.overdue = len(overdue_list)
+        self.total_attributes = {"books": book_list}
+        self.overdue_attributes = {"overdue_books": overdue_list}
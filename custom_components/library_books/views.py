@@ -0,0 +1,40 @@
+"""HTTP views for the Library Books integration."""
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+
+from .const import COVER_URL
+from .cover_cache import CoverCache
+
+# Covers for an ISBN don't change, so browsers can keep them for a week; shared caches can't,
+# as a cover reveals what the household is borrowing
+COVER_CACHE_CONTROL = "private, max-age=604800"
+
+class LibraryCoverView(HomeAssistantView):
+    """
+    Serve book covers from the local cover cache.
+
+    Dashboards load covers through <img> tags, which can't send an access token,
+    so the entities carry signed URLs (see async_sign_path) that the auth
+    middleware accepts in its place. It only serves covers of books currently on
+    loan: returned books stay in the cache for a while, and a signed URL handed
+    out for one shouldn't keep working after it has gone back.
+    """
+
+    url = COVER_URL.format(isbn="{isbn}")
+    name = "api:library_books:cover"
+    requires_auth = True
+
+    def __init__(self, cache: CoverCache):
+        """Initialize the view."""
+        self._cache = cache
+
+    async def get(self, request: web.Request, isbn: str) -> web.Response:
+        """Return the cover for an ISBN."""
+        cover = await self._cache.async_get(isbn)
+        if cover is None:
+            return web.Response(status=404)
+        content, content_type = cover
+        return web.Response(
+            body=content, content_type=content_type, headers={"Cache-Control": COVER_CACHE_CONTROL}
+        )
@@ -0,0 +1,48 @@
+"""Offline stand-ins for the Libero transport, shared by the scraper tests."""
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper, _Response, _is_streamable
+
+
+class Headers(dict):
+    """Case-insensitive headers, as returned by both HTTP libraries."""
+
+    def get(self, key, default=None):
+        return next((value for name, value in self.items() if name.lower() == key.lower()), default)
+
+
+LIBRARY_URL = "https://library.example.com"
+API_URL = f"{LIBRARY_URL}{LiberoLibraryScraper.API_ENDPOINT}"
+LOGIN_URL = f"{LIBRARY_URL}{LiberoLibraryScraper.LOGIN_ENDPOINT}"
+JSON_HEADERS = Headers({"Content-Type": "application/json"})
+SESSION_COOKIE = {"name": "SESSION", "value": "abc", "domain": "library.example.com"}
+EMPTY_MEMBERS = b'{"members": [{"loans": [], "_related": {"barcodes": [], "rsns": []}}]}'
+BOOK_PAYLOAD = (
+    b'{"members": [{"loans": [{"Barcode": "B1", "DueDate": "2025-07-01", "RenewalCount": 0}],'
+    b' "_related": {"barcodes": [{"Barcode": "B1", "RSN": "R1"}],'
+    b' "rsns": [{"RSN": "R1", "ISBN": "123", "Title": "Test Book", "AuthorKey": "Author"}]}}]}'
+)
+
+
+class FakeTransportScraper(LiberoLibraryScraper):
+    """Scraper that answers requests from a queue instead of the network."""
+
+    def __init__(self, responses, streaming=False):
+        super().__init__(LIBRARY_URL, "user", "pass", streaming=streaming)
+        self.responses = list(responses)
+        self.requests = []
+
+    async def _request(self, method, url, chunk_handler=None, stream_min_bytes=0, **kwargs):
+        self.requests.append((method, url))
+        response = self.responses.pop(0)
+        if chunk_handler and _is_streamable(response.status, response.headers, stream_min_bytes):
+            for start in range(0, len(response.content), 16):
+                chunk_handler(response.content[start:start + 16])
+            response = response._replace(content=b"")
+        return response
+
+
+def login_response():
+    return _Response(200, LOGIN_URL, Headers({"Content-Type": "text/html"}), b"<html></html>")
+
+
+def api_response():
+    return _Response(200, API_URL, JSON_HEADERS, EMPTY_MEMBERS)
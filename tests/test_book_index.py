@@ -0,0 +1,112 @@
+"""Test the due-date index."""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.book_index import BookIndex, BookMemo, MergedBookIndex
+from custom_components.library_books.models import LibraryBook
+
+TODAY = date(2025, 7, 1)
+
+
+def book_due_in(days, title=None):
+    return LibraryBook(title=title or f"Due in {days}", author="Author", due_date=TODAY + timedelta(days=days))
+
+
+def test_index_orders_books_by_due_date():
+    """Test that the index iterates in due date order."""
+    index = BookIndex([book_due_in(5), book_due_in(-2), book_due_in(1)])
+
+    assert [book.title for book in index] == ["Due in -2", "Due in 1", "Due in 5"]
+    assert len(index) == 3
+
+
+def test_between_is_start_inclusive_and_end_exclusive():
+    """Test range queries."""
+    index = BookIndex([book_due_in(days) for days in (0, 1, 1, 3, 7)])
+
+    books = index.between(TODAY + timedelta(days=1), TODAY + timedelta(days=7))
+
+    assert [book.title for book in books] == ["Due in 1", "Due in 1", "Due in 3"]
+    assert index.between(TODAY + timedelta(days=8), TODAY + timedelta(days=30)) == []
+
+
+def test_next_due():
+    """Test next-due lookups with and without an upper bound."""
+    index = BookIndex([book_due_in(10), book_due_in(-1)])
+
+    assert index.next_due(TODAY).title == "Due in 10"
+    assert index.next_due(TODAY, TODAY + timedelta(days=10)) is None
+    assert index.next_due(TODAY + timedelta(days=11)) is None
+
+
+def test_books_without_due_date_are_skipped():
+    """Test that books missing a due date are left out of the index."""
+    undated = LibraryBook(title="Undated", author="Author", due_date=None)
+
+    assert list(BookIndex([undated, book_due_in(1)])) == [book_due_in(1)]
+
+
+def test_merged_index_orders_books_across_sources():
+    """Test that the merged view interleaves sources by due date."""
+    merged = MergedBookIndex()
+    merged.update("a", BookIndex([book_due_in(1, "A1"), book_due_in(5, "A5")]))
+    merged.update("b", BookIndex([book_due_in(1, "B1"), book_due_in(3, "B3"), book_due_in(9, "B9")]))
+
+    assert [(source, book.title) for source, book in merged] == [
+        ("a", "A1"), ("b", "B1"), ("b", "B3"), ("a", "A5"), ("b", "B9"),
+    ]
+    assert len(merged) == 5
+    assert [book.title for _, book in merged.between(TODAY + timedelta(days=2), TODAY + timedelta(days=9))] == [
+        "B3", "A5",
+    ]
+    assert merged.next_due(TODAY + timedelta(days=2)) == ("b", book_due_in(3, "B3"))
+    assert merged.next_due(TODAY + timedelta(days=10)) is None
+
+
+def test_merged_index_updates_one_source_at_a_time():
+    """Test that replacing or removing one source leaves the others untouched."""
+    first = BookIndex([book_due_in(1, "A1")])
+    other = BookIndex([book_due_in(2, "B2")])
+    merged = MergedBookIndex()
+    merged.update("a", first)
+    merged.update("b", other)
+
+    assert not merged.update("a", first)
+    assert merged.update("a", BookIndex([book_due_in(4, "A4")]))
+    assert [book.title for _, book in merged] == ["B2", "A4"]
+
+    merged.remove("b")
+    merged.remove("missing")
+    assert merged.sources == ["a"]
+    assert [book.title for _, book in merged] == ["A4"]
+
+
+def test_memo_builds_each_value_once_per_index_and_day():
+    """Test that memoised values are reused until the index or date changes."""
+    built = []
+
+    def build(book, today):
+        built.append(book.title)
+        return (book.title, book.due_date < today)
+
+    index = BookIndex([book_due_in(1), book_due_in(3)])
+    memo = BookMemo(build)
+
+    month = memo.get_many(index, index.between(TODAY, TODAY + timedelta(days=31)), TODAY)
+    week = memo.get_many(index, index.between(TODAY, TODAY + timedelta(days=2)), TODAY)
+    assert week[0] is month[0]
+    assert built == ["Due in 1", "Due in 3"]
+
+    # The overdue flag rolls over with the date
+    tomorrow = TODAY + timedelta(days=2)
+    assert memo.get(index, index.next_due(TODAY), tomorrow) == ("Due in 1", True)
+
+    # A new index after an update starts afresh
+    updated = BookIndex([book_due_in(1)])
+    memo.get(updated, next(iter(updated)), tomorrow)
+    assert built == ["Due in 1", "Due in 3", "Due in 1", "Due in 1"]
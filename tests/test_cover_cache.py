@@ -0,0 +1,132 @@
+"""Test the cover image cache."""
+import asyncio
+import os
+import pytest
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.cover_cache import CoverCache, cover_key
+from custom_components.library_books.models import LibraryBook
+
+COVER_URL = "https://library.example.com/libero/Cover.cls?type=cover&size=80&isbn={isbn}"
+
+
+def book(isbn):
+    return LibraryBook(
+        title="Book", author="Author", due_date=date(2025, 7, 1), isbn=isbn, image_url=COVER_URL.format(isbn=isbn)
+    )
+
+
+class Fetcher:
+    """Cover download that returns a fixed-size JPEG body and counts calls."""
+
+    def __init__(self, size=100, content_type="image/jpeg"):
+        self.size = size
+        self.content_type = content_type
+        self.urls = []
+
+    async def __call__(self, url):
+        self.urls.append(url)
+        await asyncio.sleep(0.01)
+        return b"x" * self.size, self.content_type
+
+
+def test_cover_key_normalises_isbn():
+    assert cover_key("978-0-14-044913-6") == "9780140449136"
+    assert cover_key("014044913x") == "014044913X"
+    assert cover_key("../../etc/passwd") is None
+    assert cover_key("") is None
+
+
+@pytest.mark.asyncio
+async def test_same_isbn_is_downloaded_once(tmp_path):
+    """Test that concurrent requests and repeated loans share one download."""
+    fetch = Fetcher()
+    cache = CoverCache(str(tmp_path), fetch)
+    await cache.async_load()
+
+    missing = cache.register([book("9780140449136"), book("9780140449136")])
+    assert missing == ["9780140449136"]
+
+    results = await asyncio.gather(cache.async_get("9780140449136"), cache.async_get("978-0140449136"))
+
+    assert results[0] == results[1] == (b"x" * 100, "image/jpeg")
+    assert len(fetch.urls) == 1
+    assert cache.register([book("9780140449136")]) == []
+    assert (tmp_path / "9780140449136.jpg").exists()
+
+
+@pytest.mark.asyncio
+async def test_unregistered_isbn_is_not_fetched(tmp_path):
+    fetch = Fetcher()
+    cache = CoverCache(str(tmp_path), fetch)
+    await cache.async_load()
+
+    assert await cache.async_get("9780140449136") is None
+    assert fetch.urls == []
+
+
+@pytest.mark.asyncio
+async def test_returned_books_are_not_served(tmp_path):
+    """Test that a cached cover is only served while some account has the book on loan."""
+    fetch = Fetcher()
+    cache = CoverCache(str(tmp_path), fetch)
+    await cache.async_load()
+    await cache.async_prefetch(cache.register([book("9780140449136")], "first"))
+    cache.register([book("9780140449136")], "second")
+
+    cache.register([], "first")
+    assert await cache.async_get("9780140449136") == (b"x" * 100, "image/jpeg")
+
+    cache.forget("second")
+    assert "9780140449136" in cache
+    assert await cache.async_get("9780140449136") is None
+    assert len(fetch.urls) == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_cover_is_evicted(tmp_path):
+    """Test that the cache stays under its size limit, dropping the oldest cover."""
+    cache = CoverCache(str(tmp_path), Fetcher(size=100), max_bytes=250)
+    await cache.async_load()
+    isbns = ["9780000000001", "9780000000002", "9780000000003"]
+    await cache.async_prefetch(cache.register([book(isbn) for isbn in isbns[:2]]))
+
+    # Reading the first cover makes the second one the least recently used
+    await cache.async_get(isbns[0])
+    await cache.async_prefetch(cache.register([book(isbns[2])]))
+
+    assert isbns[0] in cache and isbns[2] in cache
+    assert isbns[1] not in cache
+    assert cache.total_bytes == 200
+    assert not (tmp_path / f"{isbns[1]}.jpg").exists()
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_across_restarts(tmp_path):
+    cache = CoverCache(str(tmp_path), Fetcher())
+    await cache.async_load()
+    await cache.async_prefetch(cache.register([book("9780140449136")]))
+
+    fetch = Fetcher()
+    restarted = CoverCache(str(tmp_path), fetch)
+    await restarted.async_load()
+    assert restarted.register([book("9780140449136")]) == []
+
+    assert await restarted.async_get("9780140449136") == (b"x" * 100, "image/jpeg")
+    assert fetch.urls == []
+
+
+@pytest.mark.asyncio
+async def test_non_image_responses_are_not_cached(tmp_path):
+    cache = CoverCache(str(tmp_path), Fetcher(content_type="text/html"))
+    await cache.async_load()
+    cache.register([book("9780140449136")])
+
+    assert await cache.async_get("9780140449136") is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,83 @@
+"""Test the refresh delta."""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.delta import diff_books
+from custom_components.library_books.models import LibraryBook
+
+TODAY = date(2025, 7, 1)
+
+
+def loan(barcode, days=7, renewals=0, title=None):
+    return LibraryBook(
+        title=title or f"Book {barcode}",
+        author="Author",
+        due_date=TODAY + timedelta(days=days),
+        barcode=barcode,
+        renewal_count=renewals,
+    )
+
+
+def test_identical_refresh_has_no_delta():
+    previous = [loan("A"), loan("B")]
+    current = [loan("B"), loan("A")]
+
+    assert not diff_books(previous, current)
+
+
+def test_added_removed_and_renewed_loans():
+    previous = [loan("A"), loan("B"), loan("C")]
+    current = [loan("A"), loan("B", days=21, renewals=1), loan("D")]
+
+    delta = diff_books(previous, current)
+
+    assert [book.barcode for book in delta.added] == ["D"]
+    assert [book.barcode for book in delta.removed] == ["C"]
+    assert len(delta.changed) == 1
+    change = delta.changed[0]
+    assert change.fields == ("due_date", "renewal_count")
+    assert change.renewed is True
+
+
+def test_earlier_due_date_is_a_change_but_not_a_renewal():
+    delta = diff_books([loan("A", days=14)], [loan("A", days=7)])
+
+    assert delta.changed[0].fields == ("due_date",)
+    assert delta.changed[0].renewed is False
+
+
+def test_catalogue_changes_are_ignored():
+    assert not diff_books([loan("A", title="Old title")], [loan("A", title="New title")])
+
+
+def test_event_data_is_compact_and_serialisable():
+    delta = diff_books([loan("A"), loan("C")], [loan("A", days=21, renewals=1), loan("B")])
+
+    assert delta.as_event_data() == {
+        "added": [{"barcode": "B", "title": "Book B", "due_date": "2025-07-08"}],
+        "removed": [{"barcode": "C", "title": "Book C", "due_date": "2025-07-08"}],
+        "changed": [
+            {
+                "barcode": "A",
+                "title": "Book A",
+                "due_date": "2025-07-22",
+                "renewed": True,
+                "changes": {"due_date": ["2025-07-08", "2025-07-22"], "renewal_count": [0, 1]},
+            }
+        ],
+    }
+
+
+def test_loans_without_barcode_match_on_title_and_author():
+    previous = [LibraryBook(title="Untagged", author="Author", due_date=TODAY)]
+    current = [LibraryBook(title="Untagged", author="Author", due_date=TODAY + timedelta(days=7))]
+
+    delta = diff_books(previous, current)
+
+    assert not delta.added and not delta.removed
+    assert delta.changed[0].renewed is True
@@ -0,0 +1,57 @@
+"""Test due-date parsing."""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.due_dates import DueDateParser, parse_due_date_fallback
+
+
+@pytest.mark.parametrize("value, expected_format", [
+    ("2025-07-01", "iso"),
+    ("2025-07-01T00:00:00Z", "iso"),
+    ("2025-07-01T23:30:00-05:00", "iso"),
+    ("01/07/2025", "dmy"),
+])
+def test_fast_path_matches_fallback(value, expected_format):
+    parser = DueDateParser()
+
+    assert parser.parse(value) == parse_due_date_fallback(value) == date(2025, 7, 1)
+    assert parser.format == expected_format
+
+
+def test_mixed_formats_fall_back_and_redetect():
+    parser = DueDateParser("iso")
+
+    assert parser.parse("2025-07-01") == date(2025, 7, 1)
+    assert parser.parse("02/07/2025") == date(2025, 7, 2)
+    assert parser.format == "dmy"
+    # Shapes no fast parser knows still go through the fallback chain
+    assert parser.parse("2025-07-03T09:00") == date(2025, 7, 3)
+    assert parser.parse("2025-07-04T09:00:00.123456+01:00") == date(2025, 7, 4)
+
+
+def test_unknown_cached_format_is_ignored():
+    assert DueDateParser("mdy").format is None
+
+
+def test_invalid_dates_raise():
+    parser = DueDateParser()
+
+    with pytest.raises(ValueError):
+        parser.parse("2025-02-30")
+    with pytest.raises(ValueError):
+        parser.parse("next Tuesday")
+    assert parser.parse("2025-02-28") == date(2025, 2, 28)
+
+
+def test_repeated_strings_are_memoised():
+    parser = DueDateParser()
+
+    first = parser.parse("01/07/2025")
+    assert parser.parse("01/07/2025") is first
@@ -0,0 +1,407 @@
+"""Offline tests for the Libero scraper fetch cycle."""
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.retry import STAGE_PARSE, FetchError
+from custom_components.library_books.scrapers import libero_scraper
+from custom_components.library_books.scrapers.libero_scraper import (
+    STREAM_BATCH_SIZE,
+    STREAM_MIN_BYTES,
+    LiberoLibraryScraper,
+    _Response,
+    _is_streamable,
+)
+from tests.libero_helpers import (
+    API_URL,
+    BOOK_PAYLOAD,
+    FakeTransportScraper,
+    Headers,
+    JSON_HEADERS,
+    LIBRARY_URL,
+    LOGIN_URL,
+    SESSION_COOKIE,
+    api_response,
+    login_response,
+)
+
+
+def test_session_expired_detection():
+    """Test the responses treated as an expired session."""
+    scraper = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")
+
+    assert scraper._is_session_expired(_Response(401, API_URL, {}, b"")) is True
+    assert scraper._is_session_expired(_Response(200, f"{LOGIN_URL}?ACTION=LOGIN", {}, b"")) is True
+    assert scraper._is_session_expired(_Response(200, API_URL, {"content-type": "text/html"}, b"<html>")) is True
+    assert scraper._is_session_expired(_Response(200, API_URL, {"content-type": "text/html"}, b"")) is True
+    assert scraper._is_session_expired(api_response()) is False
+    assert scraper._is_session_expired(_Response(500, API_URL, JSON_HEADERS, b"")) is False
+
+
+@pytest.mark.asyncio
+async def test_logs_in_when_there_is_no_session():
+    """Test that a scraper without cookies logs in before calling the API."""
+    scraper = FakeTransportScraper([login_response(), api_response()])
+
+    books = await scraper.get_outstanding_books(force_login=False)
+
+    assert books == []
+    assert [method for method, _ in scraper.requests] == ["POST", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_reuses_valid_session():
+    """Test that restored cookies let the scraper skip the login."""
+    scraper = FakeTransportScraper([api_response()])
+    scraper.import_cookies([SESSION_COOKIE])
+
+    await scraper.get_outstanding_books(force_login=False)
+
+    assert scraper.requests == [("GET", API_URL)]
+
+
+@pytest.mark.asyncio
+async def test_logs_in_again_when_session_expired():
+    """Test that an expired session triggers a single login and retry."""
+    expired = _Response(200, LOGIN_URL, Headers({"Content-Type": "text/html"}), b"<html></html>")
+    scraper = FakeTransportScraper([expired, login_response(), api_response()], streaming=True)
+    scraper.import_cookies([{"name": "SESSION", "value": "old", "domain": "library.example.com"}])
+
+    await scraper.get_outstanding_books(force_login=False)
+
+    assert [method for method, _ in scraper.requests] == ["GET", "POST", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_json_labelled_as_html_is_parsed():
+    """Test that a JSON body sent as text/html is parsed instead of treated as an expired session."""
+    for streaming in (True, False):
+        payload = _Response(200, API_URL, Headers({"Content-Type": "text/html; charset=utf-8"}), b'\n' + BOOK_PAYLOAD)
+        scraper = FakeTransportScraper([payload], streaming=streaming)
+        scraper.import_cookies([SESSION_COOKIE])
+
+        books = await scraper.get_outstanding_books(force_login=False)
+
+        assert [book.barcode for book in books] == ["B1"]
+        assert scraper.requests == [("GET", API_URL)]
+
+
+def test_cookie_round_trip():
+    """Test that exported cookies can be imported into a new scraper."""
+    scraper = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")
+    scraper.import_cookies([{"name": "SESSION", "value": "abc", "domain": "library.example.com", "path": "/libero"}])
+
+    restored = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")
+    restored.import_cookies(scraper.export_cookies())
+
+    assert restored.export_cookies() == scraper.export_cookies()
+    assert restored.session.cookies.get("SESSION") == "abc"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_payload_skips_parse():
+    """Test that an identical payload returns the previous books without parsing."""
+    payload = _Response(200, API_URL, JSON_HEADERS, BOOK_PAYLOAD)
+    scraper = FakeTransportScraper([payload, payload])
+    scraper.import_cookies([SESSION_COOKIE])
+
+    first = await scraper.get_outstanding_books(force_login=False)
+    assert scraper.last_fetch_unchanged is False
+
+    scraper._parse_libero_api_data = None  # Parsing again would fail
+    second = await scraper.get_outstanding_books(force_login=False)
+
+    assert second is first
+    assert scraper.last_fetch_unchanged is True
+
+
+@pytest.mark.asyncio
+async def test_not_modified_uses_etag():
+    """Test that the ETag is sent back and a 304 reuses the previous books."""
+    headers = Headers(JSON_HEADERS, ETag='"v1"')
+    not_modified = _Response(304, API_URL, {}, b"")
+    scraper = FakeTransportScraper([_Response(200, API_URL, headers, BOOK_PAYLOAD), not_modified])
+    scraper.import_cookies([SESSION_COOKIE])
+
+    first = await scraper.get_outstanding_books(force_login=False)
+    assert scraper._conditional_headers() == {"If-None-Match": '"v1"'}
+
+    second = await scraper.get_outstanding_books(force_login=False)
+
+    assert second is first
+    assert scraper.last_fetch_unchanged is True
+
+
+@pytest.mark.asyncio
+async def test_forget_last_fetch_parses_again():
+    """Test that forgetting the last fetch drops the validators and parses in full."""
+    headers = Headers(JSON_HEADERS, ETag='"v1"')
+    payload = _Response(200, API_URL, headers, BOOK_PAYLOAD)
+    scraper = FakeTransportScraper([payload, payload])
+    scraper.import_cookies([SESSION_COOKIE])
+
+    first = await scraper.get_outstanding_books(force_login=False)
+    scraper.forget_last_fetch()
+    assert scraper._conditional_headers() == {}
+
+    second = await scraper.get_outstanding_books(force_login=False)
+
+    assert second == first and second is not first
+    assert scraper.last_fetch_unchanged is False
+
+
+@pytest.mark.asyncio
+async def test_streaming_parse_matches_full_parse():
+    """Test that the streaming parser skips loan history and returns the same books."""
+    history = b", ".join(b'{"Barcode": "H%d", "Title": "Old"}' % i for i in range(100))
+    payload = BOOK_PAYLOAD.replace(b'"loans":', b'"loanHistory": [' + history + b'], "loans":')
+    responses = [_Response(200, API_URL, JSON_HEADERS, payload)]
+
+    streaming = FakeTransportScraper(list(responses), streaming=True)
+    streaming.import_cookies([SESSION_COOKIE])
+    buffered = FakeTransportScraper(list(responses), streaming=False)
+    buffered.import_cookies([SESSION_COOKIE])
+
+    streamed_books = await streaming.get_outstanding_books(force_login=False)
+    buffered_books = await buffered.get_outstanding_books(force_login=False)
+
+    assert streamed_books == buffered_books
+    assert [book.barcode for book in streamed_books] == ["B1"]
+    assert streaming._fingerprint == buffered._fingerprint
+
+
+def test_generated_payload_parses_every_loan():
+    """Test that the benchmark payload generator produces parseable Libero data."""
+    from benchmarks.payload_generator import generate_payload
+
+    for date_format in ("iso", "date", "dmy"):
+        payload = generate_payload(50, history=10, date_format=date_format)
+        books = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")._parse_libero_api_data(payload)
+        assert len(books) == 50
+
+
+def test_household_members_are_parsed_and_tagged():
+    """Test that every member of a household response is parsed with shared lookups."""
+    from benchmarks.payload_generator import generate_payload
+
+    payload = generate_payload(10, members=3)
+    # Household responses may list the catalogue records under one member only
+    payload["members"][0]["_related"]["rsns"] += payload["members"][2]["_related"]["rsns"]
+    payload["members"][2]["_related"]["rsns"] = []
+
+    books = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")._parse_libero_api_data(payload)
+
+    assert len(books) == 30
+    assert [book.member for book in books[::10]] == ["Member 1", "Member 2", "Member 3"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_parse_keeps_member_names():
+    """Test that named members are tagged the same by both parsers."""
+    import json
+
+    data = json.loads(BOOK_PAYLOAD)
+    data["members"][0]["Name"] = "Sam"
+    data["members"].insert(0, {"Name": "Alex", "loans": [], "_related": {"barcodes": [], "rsns": []}})
+    payload = json.dumps(data).encode()
+
+    for streaming in (True, False):
+        scraper = FakeTransportScraper([_Response(200, API_URL, JSON_HEADERS, payload)], streaming=streaming)
+        scraper.import_cookies([SESSION_COOKIE])
+        books = await scraper.get_outstanding_books(force_login=False)
+        assert [(book.barcode, book.member) for book in books] == [("B1", "Sam")]
+
+
+def test_due_date_format_is_cached_between_payloads():
+    """Test that the detected due-date format is kept for the next payload."""
+    from benchmarks.payload_generator import generate_payload
+
+    scraper = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")
+    scraper._parse_libero_api_data(generate_payload(5, date_format="dmy"))
+    assert scraper._due_date_format == "dmy"
+
+    # A library that switches format is picked up again
+    books = scraper._parse_libero_api_data(generate_payload(5, date_format="iso"))
+    assert len(books) == 5
+    assert scraper._due_date_format == "iso"
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_round_trip():
+    """Test the aiohttp transport: login, cookie export/import, 304s and session expiry."""
+    aiohttp = pytest.importorskip("aiohttp")
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    sessions = set()
+    logins = []
+
+    async def login(request):
+        logins.append(request.query["usernum"])
+        session_id = f"s{len(logins)}"
+        sessions.add(session_id)
+        response = web.Response(text="<html></html>", content_type="text/html")
+        response.set_cookie("SESSION", session_id, path="/")
+        return response
+
+    async def login_page(request):
+        return web.Response(text="<html><form></form></html>", content_type="text/html")
+
+    async def api(request):
+        if request.cookies.get("SESSION") not in sessions:
+            raise web.HTTPFound(f"{LiberoLibraryScraper.LOGIN_ENDPOINT}?ACTION=LOGIN")
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=BOOK_PAYLOAD, content_type="application/json", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_post(LiberoLibraryScraper.LOGIN_ENDPOINT, login)
+    app.router.add_get(LiberoLibraryScraper.LOGIN_ENDPOINT, login_page)
+    app.router.add_get(LiberoLibraryScraper.API_ENDPOINT, api)
+    server = TestServer(app)
+    await server.start_server()
+    library_url = str(server.make_url("")).rstrip("/")
+
+    def new_scraper():
+        session = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True, quote_cookie=False))
+        return LiberoLibraryScraper(library_url, "user", "pass", session=session)
+
+    try:
+        scraper = new_scraper()
+        assert scraper.async_transport is True
+        books = await scraper.get_outstanding_books(force_login=False)
+        assert [book.barcode for book in books] == ["B1"]
+        assert logins == ["user"]
+
+        # A restored session is reused without logging in
+        cookies = scraper.export_cookies()
+        assert [(cookie["name"], cookie["value"]) for cookie in cookies] == [("SESSION", "s1")]
+        await scraper.logout()
+        restored = new_scraper()
+        restored.import_cookies(cookies)
+        assert await restored.get_outstanding_books(force_login=False) == books
+        assert logins == ["user"]
+
+        # The ETag is sent back and the 304 reuses the books
+        again = await restored.get_outstanding_books(force_login=False)
+        assert restored.last_fetch_unchanged is True
+
+        # An expired session is redirected to the login page, so the scraper logs in once more
+        sessions.clear()
+        assert await restored.get_outstanding_books(force_login=False) is again
+        assert logins == ["user", "user"]
+        assert restored.export_cookies()[0]["value"] == "s2"
+        await restored.logout()
+    finally:
+        await server.close()
+
+
+
+def test_only_small_bodies_are_buffered_by_default():
+    """Test the Content-Length threshold applied when streaming isn't forced."""
+    large = Headers(JSON_HEADERS, **{"Content-Length": str(STREAM_MIN_BYTES)})
+
+    assert _is_streamable(200, JSON_HEADERS) is True
+    assert _is_streamable(200, Headers(JSON_HEADERS, **{"Content-Length": "100"}), STREAM_MIN_BYTES) is False
+    assert _is_streamable(200, large, STREAM_MIN_BYTES) is True
+    # Chunked bodies could be any size
+    assert _is_streamable(200, JSON_HEADERS, STREAM_MIN_BYTES) is True
+    assert _is_streamable(200, Headers(large, **{"Content-Type": "text/html"}), STREAM_MIN_BYTES) is False
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_streams_chunked_body_in_batches(monkeypatch):
+    """Test that a chunked aiohttp body is streamed, with one executor hop per batch rather than per chunk."""
+    aiohttp = pytest.importorskip("aiohttp")
+    pytest.importorskip("ijson")
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    history = b", ".join(b'{"Barcode": "H%d", "Title": "%s"}' % (i, b"x" * 100) for i in range(20000))
+    payload = BOOK_PAYLOAD.replace(b'"loans":', b'"loanHistory": [' + history + b'], "loans":')
+
+    async def api(request):
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for start in range(0, len(payload), 8192):
+            await response.write(payload[start:start + 8192])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get(LiberoLibraryScraper.API_ENDPOINT, api)
+    server = TestServer(app)
+    await server.start_server()
+
+    fed = []
+    feed = libero_scraper._StreamingPayloadParser.feed
+
+    def counting_feed(parser, chunk):
+        fed.append(len(chunk))
+        feed(parser, chunk)
+
+    monkeypatch.setattr(libero_scraper._StreamingPayloadParser, "feed", counting_feed)
+    session = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+    try:
+        scraper = LiberoLibraryScraper(str(server.make_url("")).rstrip("/"), "user", "pass", session=session)
+        scraper.import_cookies([{**SESSION_COOKIE, "domain": ""}])
+        books = await scraper.get_outstanding_books(force_login=False)
+    finally:
+        await session.close()
+        await server.close()
+
+    assert [book.barcode for book in books] == ["B1"]
+    assert len(payload) > 2 * STREAM_BATCH_SIZE
+    assert sum(fed) == len(payload)
+    assert len(fed) <= len(payload) // STREAM_BATCH_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_unchanged_small_payload_is_not_parsed_by_default():
+    """Test that the default mode hashes small bodies before any parsing."""
+    pytest.importorskip("ijson")
+    payload = _Response(200, API_URL, Headers(JSON_HEADERS, **{"Content-Length": str(len(BOOK_PAYLOAD))}), BOOK_PAYLOAD)
+    scraper = FakeTransportScraper([payload, payload], streaming=None)
+    scraper.import_cookies([SESSION_COOKIE])
+    assert scraper.streaming is True
+
+    first = await scraper.get_outstanding_books(force_login=False)
+    scraper._parse_libero_api_data = None  # Parsing again would fail
+    second = await scraper.get_outstanding_books(force_login=False)
+
+    assert second is first
+    assert scraper.last_fetch_unchanged is True
+
+
+@pytest.mark.asyncio
+async def test_invalid_json_is_a_parse_error_in_both_modes():
+    """Test that malformed JSON isn't retried, whether streamed or buffered."""
+    for streaming in (True, False):
+        scraper = FakeTransportScraper([_Response(200, API_URL, JSON_HEADERS, b'{"members": [}')], streaming=streaming)
+        scraper.import_cookies([SESSION_COOKIE])
+
+        with pytest.raises(FetchError) as error:
+            await scraper.get_outstanding_books(force_login=False)
+
+        assert error.value.stage == STAGE_PARSE
+        assert error.value.retryable is False
+
+
+
+def test_card_numbers_are_not_used_as_member_names():
+    """Test that members without a name field get a neutral label, not their card number."""
+    import json
+
+    data = json.loads(BOOK_PAYLOAD)
+    data["members"][0].update({"MemberCode": "2100012345", "Barcode": "2100012345"})
+    single = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")._parse_libero_api_data(data)
+    data["members"].append({"MemberCode": "2100067890", "loans": [], "_related": {"barcodes": [], "rsns": []}})
+    household = LiberoLibraryScraper(LIBRARY_URL, "user", "pass")._parse_libero_api_data(data)
+
+    assert [book.member for book in single] == [None]
+    assert [book.member for book in household] == ["Member 1"]
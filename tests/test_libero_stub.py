@@ -0,0 +1,66 @@
+"""End-to-end tests of the Libero scraper against the local stub server."""
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.libero_stub_server import LiberoStubServer
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper
+
+
+@pytest.fixture
+def stub_server():
+    """Run the stub server for one test."""
+    server = LiberoStubServer(loans=5, history=20).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.asyncio
+async def test_login_fetch_and_reuse(stub_server):
+    """Test a full refresh cycle, then an unchanged refresh reusing the session."""
+    scraper = LiberoLibraryScraper(stub_server.url, "member", "pin")
+    try:
+        books = await scraper.get_outstanding_books(force_login=False)
+        assert len(books) == 5
+        assert stub_server.stats["logins"] == 1
+
+        again = await scraper.get_outstanding_books(force_login=False)
+        assert again is books
+        assert scraper.last_fetch_unchanged is True
+        assert stub_server.stats["logins"] == 1
+        assert stub_server.stats["not_modified"] == 1
+    finally:
+        await scraper.logout()
+
+
+@pytest.mark.asyncio
+async def test_expired_session_logs_in_again(stub_server):
+    """Test that a session rejected by the server triggers one new login."""
+    scraper = LiberoLibraryScraper(stub_server.url, "member", "pin")
+    try:
+        await scraper.get_outstanding_books(force_login=False)
+        stub_server.expire_sessions()
+
+        books = await scraper.get_outstanding_books(force_login=False)
+
+        assert len(books) == 5
+        assert stub_server.stats["logins"] == 2
+    finally:
+        await scraper.logout()
+
+
+@pytest.mark.asyncio
+async def test_server_error_is_raised(stub_server):
+    """Test that a 5xx response fails the fetch."""
+    stub_server.error_rate = 1.0
+    scraper = LiberoLibraryScraper(stub_server.url, "member", "pin")
+    try:
+        scraper.import_cookies([{"name": "LIBERO_SESSION", "value": "x", "domain": "127.0.0.1"}])
+        with pytest.raises(Exception, match="503"):
+            await scraper.get_outstanding_books(force_login=False)
+    finally:
+        await scraper.logout()
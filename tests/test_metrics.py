@@ -0,0 +1,60 @@
+"""Test the refresh metrics."""
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.metrics import (
+    METRIC_FETCH,
+    METRIC_LOGIN,
+    METRIC_PARSE,
+    METRIC_PAYLOAD_BYTES,
+    RefreshMetrics,
+    RollingHistogram,
+)
+from tests.libero_helpers import EMPTY_MEMBERS, FakeTransportScraper, api_response, login_response
+
+
+def test_histogram_keeps_a_rolling_window():
+    histogram = RollingHistogram(size=10)
+    for value in range(1, 21):
+        histogram.add(value)
+
+    summary = histogram.summary()
+
+    assert summary["count"] == 20
+    assert (summary["min"], summary["max"], summary["last"]) == (11, 20, 20)
+    assert summary["p50"] == 15
+    assert summary["p95"] == 20
+
+
+def test_empty_histogram_summary():
+    assert RollingHistogram().summary() == {"count": 0}
+
+
+def test_timer_records_failures_too():
+    ticks = iter([1.0, 3.5])
+    metrics = RefreshMetrics(clock=lambda: next(ticks))
+
+    with pytest.raises(ValueError):
+        with metrics.time("refresh"):
+            raise ValueError
+
+    assert metrics.last("refresh") == 2.5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_scraper_records_stage_timings_and_payload_size(streaming):
+    scraper = FakeTransportScraper([login_response(), api_response()], streaming=streaming)
+
+    await scraper.get_outstanding_books(force_login=True)
+
+    histograms = scraper.metrics.as_dict()["histograms"]
+    assert histograms[METRIC_LOGIN]["count"] == 1
+    assert histograms[METRIC_FETCH]["count"] == 1
+    assert histograms[METRIC_PARSE]["count"] == 1
+    assert scraper.metrics.last(METRIC_PAYLOAD_BYTES) == len(EMPTY_MEMBERS)
@@ -162,4 +162,35 @@ def test_leading_whitespace_removed():
     )
     # .strip() removes leading/trailing whitespace, then regex removes trailing slashes (and additional whitespace)
     assert book.title == "Test Book"
-    assert book.author == "Test Author"
\ No newline at end of file
+    assert book.author == "Test Author"
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+")
+def test_library_book_is_slotted():
+    """Test that books don't carry a per-instance __dict__."""
+    book = LibraryBook(title="Test Book", author="Test Author", due_date=date(2025, 7, 1))
+    assert not hasattr(book, "__dict__")
+
+def test_author_and_library_name_are_interned():
+    """Test that equal authors and library names share one string object."""
+    first = LibraryBook(title="One", author="".join(["Test ", "Author /"]), due_date=date(2025, 7, 1),
+                        library_name="".join(["Main ", "Library"]))
+    second = LibraryBook(title="Two", author="".join(["Test ", "Author"]), due_date=date(2025, 7, 1),
+                         library_name="".join(["Main ", "Library"]))
+    assert first.author is second.author
+    assert first.library_name is second.library_name
+
+def test_library_book_dict_round_trip():
+    """Test that books survive conversion to and from a storable dict."""
+    book = LibraryBook(
+        title="Test Book",
+        author="Test Author",
+        due_date=date(2025, 7, 1),
+        isbn="1234567890",
+        barcode="B1",
+        renewal_count=2,
+        library_name="Main Library",
+    )
+    data = book.to_dict()
+
+    assert data["due_date"] == "2025-07-01"
+    assert LibraryBook.from_dict(data) == book
@@ -0,0 +1,42 @@
+"""Test the refresh profiler."""
+import asyncio
+import pytest
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.profiling import async_profile, write_profile
+
+
+async def build_payload():
+    await asyncio.sleep(0)
+    build_payload.result = [{"title": f"Book {i}"} for i in range(5000)]
+
+
+async def failing_refresh():
+    raise RuntimeError("library down")
+
+
+@pytest.mark.asyncio
+async def test_profile_reports_functions_and_allocations(tmp_path):
+    report, profiler = await async_profile(build_payload, top=10)
+
+    assert "build_payload" in report
+    assert "allocation sites" in report
+    assert "test_profiling.py" in report.split("allocation sites")[1]
+    assert not tracemalloc.is_tracing()
+
+    report_path, stats_path = write_profile(str(tmp_path), "profile", report, profiler)
+    assert Path(report_path).read_text() == report
+    assert Path(stats_path).stat().st_size > 0
+
+
+@pytest.mark.asyncio
+async def test_profile_records_errors():
+    report, _ = await async_profile(failing_refresh)
+
+    assert "RuntimeError('library down')" in report
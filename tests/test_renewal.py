@@ -0,0 +1,129 @@
+"""Test batched renewals."""
+import asyncio
+import json
+import pytest
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.library_scraper import RENEW_CONCURRENCY
+from custom_components.library_books.models import LibraryBook
+from custom_components.library_books.scrapers.libero_scraper import LiberoLibraryScraper, _Response
+from tests.libero_helpers import (
+    API_URL,
+    BOOK_PAYLOAD,
+    JSON_HEADERS,
+    SESSION_COOKIE,
+    FakeTransportScraper,
+    login_response,
+)
+
+
+class RenewingScraper(FakeTransportScraper):
+    """Scraper whose renewals succeed for the given barcodes."""
+
+    renewal_supported = True
+
+    def __init__(self, responses, renewable):
+        super().__init__(responses)
+        # The cookie the login would have set
+        self.import_cookies([SESSION_COOKIE])
+        self.renewable = renewable
+        self.running = 0
+        self.max_running = 0
+
+    async def renew_book(self, book):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if book.barcode == "broken":
+            raise RuntimeError("connection reset")
+        return book.barcode in self.renewable
+
+
+def loan(barcode):
+    return LibraryBook(title=f"Book {barcode}", author="Author", due_date=date(2025, 6, 20), barcode=barcode)
+
+
+@pytest.mark.asyncio
+async def test_batch_logs_in_once_and_refetches_once():
+    books = [loan("B1"), loan("B2"), loan("broken")] + [loan(f"X{i}") for i in range(5)]
+    scraper = RenewingScraper([login_response(), _Response(200, API_URL, JSON_HEADERS, BOOK_PAYLOAD)], {"B1"})
+
+    results, refetched = await scraper.renew_books(books)
+
+    assert [method for method, _ in scraper.requests] == ["POST", "GET"]
+    assert scraper.max_running <= RENEW_CONCURRENCY
+    outcomes = {result.barcode: result for result in results}
+    assert outcomes["B1"].renewed is True
+    assert outcomes["B1"].due_date == date(2025, 7, 1)
+    assert outcomes["B2"].renewed is False
+    assert outcomes["broken"].message == "connection reset"
+    assert [book.barcode for book in refetched] == ["B1"]
+
+
+@pytest.mark.asyncio
+async def test_batch_without_renewals_skips_refetch():
+    scraper = RenewingScraper([login_response()], set())
+
+    results, refetched = await scraper.renew_books([loan("B1")])
+
+    assert refetched is None
+    assert results[0].renewed is False
+    assert len(scraper.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_unsupported_library_reports_every_book():
+    scraper = LiberoLibraryScraper("https://library.example.com", "user", "pass")
+
+    results, refetched = await scraper.renew_books([loan("B1"), loan("B2")])
+
+    assert refetched is None
+    assert [result.renewed for result in results] == [False, False]
+    assert "isn't supported" in results[0].message
+
+
+def test_unsupported_library_marks_loans_not_renewable():
+    scraper = LiberoLibraryScraper("https://library.example.com", "user", "pass")
+
+    books = scraper._parse_libero_api_data(json.loads(BOOK_PAYLOAD))
+
+    assert [book.renewable for book in books] == [False]
+
+
+@pytest.mark.asyncio
+async def test_renewal_drops_the_coalesced_refresh_result():
+    """Test that a refresh right after a renewal doesn't return the pre-renewal books."""
+    pytest.importorskip("homeassistant")
+    from custom_components.library_books.coordinator import LibraryBooksCoordinator
+    from custom_components.library_books.scheduler import RefreshScheduler
+
+    scheduler = RefreshScheduler(coalesce_window=60)
+    before = [loan("B1")]
+    await scheduler.async_run("entry", "https://library.example.com", lambda: asyncio.sleep(0, before))
+
+    scraper = RenewingScraper([login_response(), _Response(200, API_URL, JSON_HEADERS, BOOK_PAYLOAD)], {"B1"})
+    coordinator = LibraryBooksCoordinator.__new__(LibraryBooksCoordinator)
+    coordinator.scraper = scraper
+    coordinator.entry_id = "entry"
+    coordinator.library_name = "Library"
+    coordinator._scheduler = scheduler
+    coordinator.data = before
+    coordinator.async_set_updated_data = lambda books: setattr(coordinator, "data", books)
+
+    async def process(books):
+        return books
+
+    coordinator._async_process_books = process
+
+    await coordinator.async_renew_books(["B1"])
+    after = await scheduler.async_run("entry", "https://library.example.com", lambda: asyncio.sleep(0, coordinator.data))
+
+    assert after is coordinator.data
+    assert after[0].due_date == date(2025, 7, 1)
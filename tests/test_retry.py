@@ -0,0 +1,151 @@
+"""Test the retry policy and circuit breaker."""
+import pytest
+import sys
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books import library_scraper, retry
+from custom_components.library_books.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchError,
+    STAGE_FETCH,
+    STAGE_LOGIN,
+    parse_retry_after,
+    retry_delay,
+)
+from custom_components.library_books.scrapers.libero_scraper import _Response
+from tests.libero_helpers import (
+    API_URL,
+    SESSION_COOKIE,
+    FakeTransportScraper,
+    Headers,
+    api_response,
+    login_response,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def no_sleep_or_shared_state(monkeypatch):
+    """Don't wait between attempts, and give every test fresh circuit breakers."""
+    monkeypatch.setattr(retry, "_CIRCUIT_BREAKERS", {})
+    monkeypatch.setattr(library_scraper, "retry_delay", lambda attempt, retry_after=None: 0)
+
+
+def unavailable(retry_after="1"):
+    return _Response(503, API_URL, Headers({"Retry-After": retry_after}), b"Service unavailable")
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(in_a_minute) <= 60
+
+
+def test_retry_delay_backs_off_with_jitter():
+    delays = [retry_delay(attempt) for attempt in range(4) for _ in range(20)]
+    assert all(1 <= delay <= 2 for delay in delays[:20])
+    assert all(8 <= delay <= 16 for delay in delays[60:])
+    assert len(set(delays)) > 1
+    assert retry_delay(0, retry_after=10) >= 10
+
+
+def test_error_status_classification():
+    assert FetchError.from_status(STAGE_FETCH, 503, {"retry-after": "5"}, "down").retryable is True
+    assert FetchError.from_status(STAGE_FETCH, 503, {"retry-after": "5"}, "down").retry_after == 5
+    assert FetchError.from_status(STAGE_LOGIN, 401, {}, "denied").retryable is False
+
+
+def test_circuit_opens_after_repeated_failures_and_lets_one_trial_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow_request()
+
+    clock.now += 61
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # Only one trial while it is running
+
+    breaker.record_success()
+    assert breaker.allow_request() and not breaker.is_open
+
+
+def test_long_retry_after_opens_circuit():
+    clock = Clock()
+    breaker = CircuitBreaker(clock=clock)
+
+    breaker.record_failure(retry_after=600)
+
+    assert breaker.is_open
+    assert breaker.remaining == 600
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_retried_without_logging_in_again():
+    scraper = FakeTransportScraper([login_response(), unavailable(), api_response()])
+    # The cookie the login would have set
+    scraper.import_cookies([SESSION_COOKIE])
+
+    books = await scraper.get_books_with_retry(max_retries=3, force_login=True)
+
+    assert books == []
+    assert [method for method, _ in scraper.requests] == ["POST", "GET", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_login_is_not_retried():
+    scraper = FakeTransportScraper([_Response(401, API_URL, Headers(), b"")])
+
+    with pytest.raises(FetchError, match="Authentication failed"):
+        await scraper.get_books_with_retry(max_retries=3, force_login=True)
+    assert len(scraper.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    """Test that a host asking to be left alone isn't contacted until the cool-down ends."""
+    scraper = FakeTransportScraper([login_response(), unavailable(retry_after="3600")])
+
+    with pytest.raises(FetchError, match="503"):
+        await scraper.get_books_with_retry(max_retries=3, force_login=True)
+    assert len(scraper.requests) == 2
+
+    with pytest.raises(CircuitOpenError):
+        await scraper.get_books_with_retry(max_retries=3, force_login=True)
+    assert len(scraper.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_login_during_trial_closes_circuit():
+    """Test that one account's wrong password doesn't keep the host's other accounts locked out."""
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+    retry._CIRCUIT_BREAKERS[library_scraper.host_key(API_URL)] = breaker
+    breaker.record_failure()
+    clock.now += 61
+
+    rejected = FakeTransportScraper([_Response(401, API_URL, Headers(), b"")])
+    with pytest.raises(FetchError, match="Authentication failed"):
+        await rejected.get_books_with_retry(max_retries=3, force_login=True)
+
+    healthy = FakeTransportScraper([login_response(), api_response()])
+    assert await healthy.get_books_with_retry(max_retries=3, force_login=True) == []
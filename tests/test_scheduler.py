@@ -0,0 +1,150 @@
+"""Test the refresh scheduler."""
+import asyncio
+import pytest
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.models import LibraryBook
+from custom_components.library_books.scheduler import RefreshScheduler, adaptive_update_interval
+
+FLOOR = timedelta(hours=1)
+CEILING = timedelta(hours=24)
+TODAY = date(2025, 7, 1)
+
+
+def books_due_in(*days):
+    return [LibraryBook(title="Book", author="Author", due_date=TODAY + timedelta(days=d)) for d in days]
+
+
+class Refresh:
+    """Refresh that records how many calls run at the same time."""
+
+    def __init__(self, duration=0.01):
+        self.duration = duration
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.duration)
+        self.running -= 1
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_for_same_entry_are_merged():
+    """Test that a refresh requested while one is running shares its result."""
+    scheduler = RefreshScheduler()
+    refresh = Refresh()
+
+    results = await asyncio.gather(
+        scheduler.async_run("entry", "https://library.example.com", refresh),
+        scheduler.async_run("entry", "https://library.example.com", refresh),
+    )
+
+    assert results == [1, 1]
+    assert refresh.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_recent_result_is_reused_within_window():
+    """Test that back-to-back refreshes reuse the last result."""
+    scheduler = RefreshScheduler(coalesce_window=60)
+    refresh = Refresh()
+
+    await scheduler.async_run("entry", "https://library.example.com", refresh)
+    assert await scheduler.async_run("entry", "https://library.example.com", refresh) == 1
+
+    scheduler.forget("entry")
+    assert await scheduler.async_run("entry", "https://library.example.com", refresh) == 2
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit():
+    """Test that refreshes against one host are capped."""
+    scheduler = RefreshScheduler(max_concurrent=10, max_per_host=2)
+    refresh = Refresh()
+
+    await asyncio.gather(*(
+        scheduler.async_run(f"entry{i}", "https://library.example.com", refresh) for i in range(6)
+    ))
+
+    assert refresh.calls == 6
+    assert refresh.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_global_limit():
+    """Test that refreshes across hosts are capped globally."""
+    scheduler = RefreshScheduler(max_concurrent=3, max_per_host=10)
+    refresh = Refresh()
+
+    await asyncio.gather(*(
+        scheduler.async_run(f"entry{i}", f"https://library{i}.example.com", refresh) for i in range(6)
+    ))
+
+    assert refresh.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_busy_host_does_not_hold_back_other_hosts():
+    """Test that refreshes queued behind a busy host don't take global slots from idle hosts."""
+    scheduler = RefreshScheduler(max_concurrent=4, max_per_host=2)
+    busy = Refresh(duration=0.1)
+    idle = Refresh()
+
+    busy_refreshes = [
+        asyncio.ensure_future(scheduler.async_run(f"busy{i}", "https://busy.example.com", busy)) for i in range(6)
+    ]
+    await asyncio.sleep(0)
+    await scheduler.async_run("idle", "https://idle.example.com", idle)
+
+    # Only the busy host's first batch has run; the idle host didn't wait for the rest
+    assert busy.calls == 2
+    assert idle.calls == 1
+    await asyncio.gather(*busy_refreshes)
+    assert busy.max_running == 2
+
+
+def test_jittered_interval_stays_within_bounds():
+    """Test that jitter only moves the interval by the configured fraction."""
+    scheduler = RefreshScheduler(jitter=0.1)
+    intervals = {scheduler.jittered_interval(timedelta(hours=6)) for _ in range(50)}
+
+    assert len(intervals) > 1
+    assert all(timedelta(hours=5.4) <= interval <= timedelta(hours=6.6) for interval in intervals)
+
+
+def test_startup_delays_are_spread():
+    """Test that first refreshes after startup are spread over the configured window."""
+    scheduler = RefreshScheduler(startup_spread=120)
+    delays = {scheduler.startup_delay() for _ in range(50)}
+
+    assert len(delays) > 1
+    assert all(0 <= delay <= 120 for delay in delays)
+
+
+def test_adaptive_interval_uses_ceiling_when_nothing_is_due_soon():
+    """Test that accounts with no books or distant due dates poll rarely."""
+    assert adaptive_update_interval([], FLOOR, CEILING, TODAY) == CEILING
+    assert adaptive_update_interval(books_due_in(21, 28), FLOOR, CEILING, TODAY) == CEILING
+
+
+def test_adaptive_interval_shrinks_as_due_date_approaches():
+    """Test that the interval follows the nearest due date."""
+    assert adaptive_update_interval(books_due_in(20, 2), FLOOR, CEILING, TODAY) == timedelta(hours=12)
+    assert adaptive_update_interval(books_due_in(3), FLOOR, CEILING, TODAY) == timedelta(hours=18)
+
+
+def test_adaptive_interval_uses_floor_when_due_or_overdue():
+    """Test that books due within a day or overdue poll at the floor."""
+    assert adaptive_update_interval(books_due_in(1), FLOOR, CEILING, TODAY) == FLOOR
+    assert adaptive_update_interval(books_due_in(14, -3), FLOOR, CEILING, TODAY) == FLOOR
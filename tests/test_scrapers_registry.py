@@ -0,0 +1,36 @@
+"""Test the scraper registry."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.library_scraper import BaseLibraryScraper
+from custom_components.library_books.scrapers import LIBRARY_TYPES, SCRAPERS, get_scraper_class
+
+
+def test_every_registered_type_resolves_to_a_scraper():
+    assert set(LIBRARY_TYPES) == set(SCRAPERS)
+    for library_type in SCRAPERS:
+        assert issubclass(get_scraper_class(library_type), BaseLibraryScraper)
+
+
+def test_unknown_library_type_is_rejected():
+    with pytest.raises(ValueError):
+        get_scraper_class("unknown")
+
+
+def test_backends_are_not_imported_with_the_registry():
+    code = (
+        "import sys\n"
+        "import custom_components.library_books.scrapers\n"
+        "import custom_components.library_books.scheduler\n"
+        "import custom_components.library_books.session_pool\n"
+        "assert 'custom_components.library_books.scrapers.libero_scraper' not in sys.modules\n"
+        "assert 'requests' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=project_root, check=True)
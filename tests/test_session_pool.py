@@ -0,0 +1,79 @@
+"""Test the per-host session pool."""
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.const import TRANSPORT_AIOHTTP, TRANSPORT_REQUESTS
+from custom_components.library_books.session_pool import SessionPool, host_key
+
+
+def shared_adapter(session):
+    return session.get_adapter("https://library.example.com/libero/WebOpac.cls")
+
+
+def test_host_key_normalises_url():
+    """Test that equivalent library URLs share a pool key."""
+    assert host_key("library.example.com/") == "https://library.example.com"
+    assert host_key("https://Library.Example.com/libero") == "https://library.example.com"
+    assert host_key("http://library.example.com") != host_key("https://library.example.com")
+
+
+def test_sessions_share_connections_but_not_cookies():
+    """Test that accounts on the same host share an adapter but keep separate cookies."""
+    pool = SessionPool()
+    first = pool.acquire("https://library.example.com", TRANSPORT_REQUESTS)
+    second = pool.acquire("library.example.com/", TRANSPORT_REQUESTS)
+    other = pool.acquire("https://other.example.com", TRANSPORT_REQUESTS)
+
+    assert shared_adapter(first) is shared_adapter(second)
+    assert other.get_adapter("https://other.example.com/") is not shared_adapter(first)
+
+    first.cookies.set("SESSION", "one", domain="library.example.com")
+    assert second.cookies.get("SESSION") is None
+
+
+@pytest.mark.asyncio
+async def test_pool_closed_after_last_release():
+    """Test that the host pool stays open until every session is released."""
+    pool = SessionPool()
+    first = pool.acquire("https://library.example.com", TRANSPORT_REQUESTS)
+    second = pool.acquire("https://library.example.com", TRANSPORT_REQUESTS)
+    adapter = shared_adapter(first)
+
+    first.close()
+    await pool.async_release("https://library.example.com", TRANSPORT_REQUESTS)
+    assert pool._pools
+
+    second.close()
+    await pool.async_release("https://library.example.com", TRANSPORT_REQUESTS)
+    assert not pool._pools
+
+    third = pool.acquire("https://library.example.com", TRANSPORT_REQUESTS)
+    assert shared_adapter(third) is not adapter
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_sessions_come_from_the_factory():
+    """Test that aiohttp sessions are created by the given factory, each with its own cookie jar."""
+    aiohttp = pytest.importorskip("aiohttp")
+    created = []
+
+    def factory(**kwargs):
+        created.append(kwargs)
+        return aiohttp.ClientSession(**kwargs)
+
+    pool = SessionPool(factory)
+    first = pool.acquire("https://library.example.com", TRANSPORT_AIOHTTP)
+    second = pool.acquire("https://library.example.com", TRANSPORT_AIOHTTP)
+
+    assert len(created) == 2
+    assert first.cookie_jar is not second.cookie_jar
+    assert not pool._pools
+
+    for session in (first, second):
+        await session.close()
+        await pool.async_release("https://library.example.com", TRANSPORT_AIOHTTP)
@@ -0,0 +1,79 @@
+"""Test the sensor snapshot."""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from custom_components.library_books.models import LibraryBook
+from custom_components.library_books.snapshot import BooksSnapshot
+
+TODAY = date(2025, 7, 1)
+
+
+def test_snapshot_counts_and_attributes():
+    """Test that counts and attributes are computed against the snapshot date."""
+    books = [
+        LibraryBook(title="Late", author="Author", due_date=TODAY - timedelta(days=3)),
+        LibraryBook(title="Soon", author="Author", due_date=TODAY + timedelta(days=2)),
+    ]
+
+    snapshot = BooksSnapshot(books, TODAY)
+
+    assert snapshot.total == 2
+    assert snapshot.overdue == 1
+    assert snapshot.total_attributes["books"][1] == {
+        "title": "Soon",
+        "author": "Author",
+        "due_date": "2025-07-03",
+        "is_overdue": False,
+        "days_until_due": 2,
+    }
+    assert snapshot.overdue_attributes == {
+        "overdue_books": [
+            {"title": "Late", "author": "Author", "due_date": "2025-06-28", "days_overdue": 3},
+        ]
+    }
+
+
+def test_snapshot_rolls_over_with_date():
+    """Test that a book becomes overdue in the next day's snapshot."""
+    books = [LibraryBook(title="Due today", author="Author", due_date=TODAY)]
+
+    assert BooksSnapshot(books, TODAY).overdue == 0
+    assert BooksSnapshot(books, TODAY + timedelta(days=1)).overdue == 1
+
+
+def test_empty_snapshot():
+    """Test that missing data produces zero counts and no attributes."""
+    snapshot = BooksSnapshot(None, TODAY)
+
+    assert (snapshot.total, snapshot.overdue) == (0, 0)
+    assert snapshot.total_attributes == {}
+    assert snapshot.overdue_attributes == {}
+
+
+def test_snapshot_links_covers_to_local_cache():
+    """Test that books with an ISBN get a cover URL served by Home Assistant."""
+    books = [
+        LibraryBook(title="Covered", author="Author", due_date=TODAY, isbn="978-0-14-044913-6", image_url="https://x"),
+        LibraryBook(title="No ISBN", author="Author", due_date=TODAY),
+    ]
+
+    book_list = BooksSnapshot(books, TODAY).total_attributes["books"]
+
+    assert book_list[0]["cover_url"] == "/api/library_books/cover/9780140449136"
+    assert "cover_url" not in book_list[1]
+
+
+def test_snapshot_uses_given_cover_url():
+    """Test that cover URLs come from the callback, so the coordinator can sign them."""
+    books = [
+        LibraryBook(title="Covered", author="Author", due_date=TODAY, isbn="978-0-14-044913-6", image_url="https://x"),
+    ]
+
+    book_list = BooksSnapshot(books, TODAY, lambda isbn: f"/signed/{isbn}?authSig=x").total_attributes["books"]
+
+    assert book_list[0]["cover_url"] == "/signed/9780140449136?authSig=x"